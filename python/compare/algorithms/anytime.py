@@ -0,0 +1,182 @@
+#implementation of forward and backward chaining algorithms that stop when a work budget is spent and can be resumed
+
+# entry :
+#  - kb : a CompiledKB (see compiled.py)
+#  - facts_base : a list of variable ids that are True (fact base)
+#  - question : the id of a variable of which we must determine the value
+#  - budget : a Budget, the work the query may do before it returns
+
+# exit :
+#     - A : TRUE if question is a LOGICAL CONSEQUENCE of the fact base, FALSE if it is not,
+#           UNKNOWN if the budget was spent first (values of compiled.py)
+#     - C : the query itself : C.run(budget) goes on from where it stopped
+
+# A ForwardQuery is forward_compiled with its loop variables kept in the query : the
+# position in the agenda and the position in the rules of the variable being read.
+# When the budget is spent it returns UNKNOWN between two counter decrements, and
+# the next run starts again at the next decrement : no counter is decremented twice.
+# A BackwardQuery is a BackwardSession (backward_compiled) whose OR stack is kept in
+# the query : it returns UNKNOWN between two steps of OR (a rule tried, or an AND
+# that goes on after an antecedent was decided), and the next run pops the same stack.
+# The session must not be asked anything else while a query is suspended.
+
+# A budget counts :
+#  - steps : counter decrements (forward) or steps of OR (backward)
+#  - firings : rules whose counter reaches 0 (forward) or rules tried (backward)
+#  - seconds : wall-clock time, read every CLOCK_PERIOD steps (forward) or at each step (backward)
+# None is no limit.
+
+import math
+import time
+
+from compiled import UNKNOWN, TRUE, FALSE, QueryState
+from algorithms.backward_compiled import RULE, RULES, NEXT_RULE, BackwardSession
+
+# number of counter decrements between two readings of the clock (forward)
+CLOCK_PERIOD = 256
+
+
+class Budget :
+    """the work one run of a query may do, None is no limit"""
+
+    def __init__(self, steps=None, firings=None, seconds=None) :
+        self.steps = steps
+        self.firings = firings
+        self.seconds = seconds
+
+    def limits(self) :
+        """(steps, firings, deadline) for a run starting now"""
+        steps = math.inf if self.steps is None else self.steps
+        firings = math.inf if self.firings is None else self.firings
+        deadline = math.inf if self.seconds is None else time.perf_counter() + self.seconds
+        return steps, firings, deadline
+
+
+class ForwardQuery :
+    """a forward chaining query that can be stopped and resumed :
+    - state : its QueryState
+    - read : position in state.agenda of the variable being read
+    - next_rule : position in kb.ant_rules of the next rule of that variable, -1 before its first one
+    - value : TRUE or FALSE once it is decided, else UNKNOWN"""
+
+    def __init__(self, kb, facts_base, question) :
+        self.kb = kb
+        self.question = question
+        self.state = QueryState(kb, facts_base)
+        self.read = 0
+        self.next_rule = -1
+        self.value = TRUE if self.state.value(question) == TRUE else UNKNOWN
+
+    def run(self, budget) :
+        if self.value != UNKNOWN :
+            return self.value
+        state = self.state
+        epoch = state.epoch
+        counters = state.counters
+        rule_stamp = state.rule_stamp
+        values = state.values
+        var_stamp = state.var_stamp
+        agenda = state.agenda
+        kb = self.kb
+        ant_offsets = kb.ant_offsets
+        ant_rules = kb.ant_rules
+        heads = kb.heads
+        body_len = kb.body_len
+        question = self.question
+
+        steps, firings, deadline = budget.limits()
+        spent = 0
+        # the budget is only looked at when spent reaches check
+        check = 0 if firings <= 0 else min(steps, CLOCK_PERIOD)
+        read = self.read
+        position = self.next_rule
+        while read < len(agenda) :
+            variable = agenda[read]
+            if position == -1 :
+                position = ant_offsets[variable]
+            end = ant_offsets[variable+1]
+            while position < end :
+                if spent == check :
+                    if spent == steps or firings <= 0 or time.perf_counter() > deadline :
+                        self.read = read
+                        self.next_rule = position
+                        return UNKNOWN
+                    check = min(steps, spent + CLOCK_PERIOD)
+                spent += 1
+                rule = ant_rules[position]
+                position += 1
+                if rule_stamp[rule] != epoch :
+                    rule_stamp[rule] = epoch
+                    counters[rule] = body_len[rule] - 1
+                else :
+                    counters[rule] -= 1
+                if counters[rule] == 0 :
+                    firings -= 1
+                    if firings <= 0 :
+                        check = spent
+                    consequent = heads[rule]
+                    if consequent == question :
+                        self.value = TRUE
+                        return TRUE
+                    if var_stamp[consequent] != epoch :
+                        values[consequent] = TRUE
+                        var_stamp[consequent] = epoch
+                        agenda.append(consequent)
+            read += 1
+            position = -1
+
+        self.value = FALSE
+        return FALSE
+
+
+class BackwardQuery :
+    """a backward chaining query that can be stopped and resumed :
+    - session : the BackwardSession it runs on
+    - stack : the OR stack, empty once the query is decided
+    - value : TRUE or FALSE once it is decided, else UNKNOWN"""
+
+    def __init__(self, kb, facts_base, question, session=None) :
+        self.question = question
+        self.session = BackwardSession(kb, facts_base) if session is None else session
+        self.session.begin()
+        self.stack = []
+        self.value = UNKNOWN
+        if self.session.recall(question) == UNKNOWN :
+            self.session.call_OR(question, self.stack)
+        else :
+            self.decide()
+
+    def run(self, budget) :
+        if self.value != UNKNOWN :
+            return self.value
+        session = self.session
+        stack = self.stack
+        steps, firings, deadline = budget.limits()
+        spent = 0
+        while stack :
+            # a step of OR may scan many antecedents, the clock is read at each one
+            if spent == steps or firings <= 0 or time.perf_counter() > deadline :
+                return UNKNOWN
+            spent += 1
+            frame = stack[-1]
+            if frame[RULE] is None and frame[NEXT_RULE] < len(frame[RULES]) :
+                firings -= 1
+            session.step(stack)
+        return self.decide()
+
+    def decide(self) :
+        self.value = TRUE if self.session.value(self.question) == TRUE else FALSE
+        self.session.release()
+        return self.value
+
+
+def forward(kb, facts_base, question, budget) :
+    """returns (TRUE, FALSE or UNKNOWN, the query to resume)"""
+    query = ForwardQuery(kb, facts_base, question)
+    return query.run(budget), query
+
+
+def backward(kb, facts_base, question, budget, session=None) :
+    """returns (TRUE, FALSE or UNKNOWN, the query to resume)"""
+    query = BackwardQuery(kb, facts_base, question, session)
+    return query.run(budget), query
@@ -252,7 +252,7 @@ def OR_steps(P) :
     P.order = counter #fonction ?
     counter += 1
 
-    if P.rules == [] :
+    if not P.rules :
         print("c'est vide batard")
 
     for R in P.rules :
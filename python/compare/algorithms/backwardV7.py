@@ -0,0 +1,172 @@
+#implementation of the backward chaining algorithm (backwardV5) without recursion
+
+# entry :
+#  - rules : a list of Rule objects
+#  - facts_base : a list of Variable objects that are True (fact base)
+#  - Q : the Variable of which we must determine the value
+
+# exit :
+#     - A : a boolean which value is True if Q is a LOGICAL CONSEQUENCE of the fact base
+
+# Same algorithm as backwardV5, step for step : same ON values, same order/root handling
+# of the cycles, same assignFalse and INVERSE. In backwardV5, OR calls AND which calls OR,
+# so the depth of the Python stack is the length of the longest chain of rules that is
+# explored, and INVERSE calls itself along the chain of its consequents.
+# Here each call of OR is a frame on an explicit stack, kept in a list :
+#   [P, index of the next rule of P, flag, current rule R, index of the next antecedent of R]
+# AND is only ever called by OR and only one AND of an OR is running at a time, so the
+# frame of an OR also holds the AND it is running. When AND needs OR(p), a frame for p is
+# pushed, and when it is popped the AND of the frame below goes on with p.
+# INVERSE keeps a stack of iterators on the successors it is going through.
+# The memory used is one frame per ON variable, with no limit on the depth.
+
+import math
+
+ON = "ON"
+counter = 0
+root = math.inf
+on_list = []
+
+# fields of a frame
+VAR, NEXT_RULE, FLAG, RULE, NEXT_ANT = range(5)
+# returned by AND when it pushed the frame of an OR
+CALLED = object()
+
+
+def pre_processing (rules, facts_base) :
+
+    for rule in rules :
+        rule.consequent.addRule(rule)
+    for var in facts_base :
+        var.assign()
+
+
+def main(Q):
+
+    if Q.evaluate() == None :
+        OR(Q)
+
+    if Q.isTrue() :
+        return (True)
+    else :
+        return (False)
+
+
+def call_OR(P, stack) :
+    """the beginning of OR(P) in backwardV5 : P is set ON and gets its order"""
+    global counter
+
+    P.assign(ON)
+    P.order = counter
+    counter += 1
+    stack.append([P, 0, None, None, 0])
+
+
+def OR(Q) :
+    global root
+    global on_list
+
+    stack = []
+    call_OR(Q, stack)
+
+    while stack :
+        frame = stack[-1]
+        P = frame[VAR]
+        R = frame[RULE]
+        output = None
+
+        if R is None :
+            # for R in P.rules
+            if frame[NEXT_RULE] == len(P.rules) :
+                stack.pop()
+                if not frame[FLAG] :
+                    P.assign(False)
+                    if P.order == root :
+                        assignFalse()
+                continue
+            R = frame[RULE] = P.rules[frame[NEXT_RULE]]
+            frame[NEXT_RULE] += 1
+            frame[NEXT_ANT] = 0
+
+        elif frame[NEXT_ANT] :
+            # the AND of this frame called OR(p) on its previous antecedent, which is done
+            p = R.antecedents[frame[NEXT_ANT] - 1]
+            if p.evaluate() == False :
+                output = False
+            elif p.evaluate() == ON :
+                R.addSuccessor(p)
+
+        if output is None :
+            output = AND(R, frame, stack)
+            if output is CALLED :
+                continue
+
+        # back in OR(P) with the output of AND(R)
+        frame[RULE] = None
+        if output == True :
+            stack.pop()
+            P.assign()
+            INVERSE(P)
+            if P.order == root :
+                assignFalse()
+            continue
+
+        if output != False :
+            for p in output :
+                p.addSuccessor(R)
+                if p.order < root :
+                    root = p.order
+            frame[FLAG] = True
+            R.counter = len(output)
+            on_list.append(P)
+
+
+def AND(R, frame, stack) :
+    """AND(R) of backwardV5 from the antecedent frame[NEXT_ANT] : returns CALLED
+    if it stopped to call OR on an antecedent, else the output of AND(R)"""
+
+    antecedents = R.antecedents
+    for j in range(frame[NEXT_ANT], len(antecedents)) :
+        p = antecedents[j]
+        if p.isTrue3() :
+            continue
+        if p.evaluate() == None :
+            frame[NEXT_ANT] = j + 1
+            call_OR(p, stack)
+            return CALLED
+        if p.evaluate() == False :
+            return (False)
+        if p.evaluate() == ON :
+            R.addSuccessor(p)
+
+    if not R.successors :
+        return (True)
+
+    return R.successors
+
+
+def INVERSE(P) :
+    stack = [iter(P.successors)]
+    while stack :
+        for R in stack[-1] :
+            R.counter -= 1
+            if R.counter == 0 :
+                R.consequent.assign()
+                if R.consequent.successors :
+                    stack.append(iter(R.consequent.successors))
+                    break
+        else :
+            stack.pop()
+
+
+def assignFalse() :
+    global counter
+    global root
+    global on_list
+
+    for p in on_list :
+        if p.value == ON :
+            p.assign(False)
+    on_list = []
+    counter = 0
+    root = math.inf
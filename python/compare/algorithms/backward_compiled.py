@@ -0,0 +1,301 @@
+#implementation of the backward chaining algorithm (backwardV5) on a compiled knowledge base
+
+# entry :
+#  - kb : a CompiledKB (see compiled.py)
+#  - facts_base : a list of variable ids that are True (fact base)
+#  - question : the id of a variable of which we must determine the value
+
+# exit :
+#     - A : a boolean which value is True if question is a LOGICAL CONSEQUENCE of the fact base
+
+# The values, orders and successors that backwardV5 stores in the Variable and Rule
+# objects are kept in a BackwardState, so the compiled kb is built once and never
+# modified. A BackwardState can be reused with state.reset(facts_base), the values
+# of the previous query are invalidated by their epoch stamp.
+
+# counter, root and on_list, the module globals of backwardV5, belong to a
+# BackwardSession, a BackwardState that also runs the algorithm. Nothing is shared
+# between two sessions but the read-only kb : each thread can query the same kb
+# with its own session. OR and AND run on an explicit stack as in backwardV7, so
+# the depth of the rule base is not bounded by the recursion limit either.
+
+# A session can keep what its queries proved and refuted in a BackwardMemo, for
+# each fact base. When the session is reset on a fact base the memo already
+# knows, its proven variables are True and its refuted ones False : the memo is
+# read before OR is called on a variable, and OR is not called on them again.
+# The logic is monotone : on a larger fact base the proven variables stay True
+# but the refuted ones may not stay False.
+
+import math
+from array import array
+
+from compiled import UNKNOWN, TRUE, FALSE, ON, QueryState
+
+# fields of a frame of the OR stack (cf backwardV7)
+VAR, RULES, NEXT_RULE, FLAG, RULE, ANTECEDENTS, NEXT_ANT = range(7)
+# returned by AND when it pushed the frame of an OR
+CALLED = object()
+
+
+class BackwardState(QueryState) :
+    """per query state of the backward algorithm, a QueryState with :
+    - order : order in which the variables were set ON
+    - var_successors : rules waiting for an ON variable {variable : [rules]}
+    - rule_successors : ON antecedents of a rule {rule : [variables]}
+    the counters of a waiting rule count the ON antecedents it still needs.
+    order and counters are only read for variables set ON and rules waiting
+    during the current query, so they need no stamp of their own"""
+
+    def __init__(self, kb, facts_base=()) :
+        self.order = array('i', [-1]) * kb.n_vars
+        QueryState.__init__(self, kb, facts_base)
+
+    def reset(self, facts_base=()) :
+        QueryState.reset(self, facts_base)
+        self.var_successors = {}
+        self.rule_successors = {}
+
+
+class BackwardMemo :
+    """variables proven (True) and refuted (False) by the backward queries,
+    for each fact base : entries = {frozenset(facts_base) : (proven, refuted)}.
+    The sessions of a memo update it in place, they must run in the same thread"""
+
+    def __init__(self) :
+        self.entries = {}
+
+    def entry(self, facts_base) :
+        """(proven, refuted) sets of a fact base, the facts are proven"""
+        key = frozenset(facts_base)
+        if key not in self.entries :
+            self.entries[key] = (set(key), set())
+        return self.entries[key]
+
+    def add_facts(self, facts_base, facts) :
+        """returns the fact base facts_base + facts, its entry starts with
+        everything proven on facts_base, nothing refuted on facts_base is kept"""
+        key = frozenset(facts_base)
+        extended = key.union(facts)
+        proven, refuted = self.entry(extended)
+        if key in self.entries :
+            proven |= self.entries[key][0]
+        return extended
+
+    def __len__(self) :
+        return len(self.entries)
+
+
+class BackwardSession(BackwardState) :
+    """a BackwardState with the globals of backwardV5 :
+    - counter : order given to the next variable set ON
+    - root : lowest order an ON variable still waits for
+    - on_list : variables that wait for an ON variable
+    session.ask(question) answers a question on the current fact base,
+    session.reset(facts_base) starts over with another one.
+    With a BackwardMemo, the variables proven or refuted by a query are recorded
+    in it, and are known again when the session is reset on the same fact base"""
+
+    def __init__(self, kb, facts_base=(), memo=None) :
+        self.kb = kb
+        self.memo = memo
+        BackwardState.__init__(self, kb, facts_base)
+
+    def reset(self, facts_base=()) :
+        self.counter = 0
+        self.root = math.inf
+        self.on_list = []
+        if self.memo is not None :
+            key = frozenset(facts_base)
+            # every value of the state is final for this fact base, it is kept
+            if self.epoch and key == self.facts_base :
+                self.release()
+                return
+            facts_base = key
+        BackwardState.reset(self, facts_base)
+        self.facts_base = facts_base
+        self.visited = []
+        if self.memo is not None :
+            self.proven, self.refuted = self.memo.entry(facts_base)
+
+    def add_facts(self, facts) :
+        """the fact base of the session becomes facts_base + facts"""
+        if self.memo is not None :
+            self.reset(self.memo.add_facts(self.facts_base, facts))
+        else :
+            self.reset(set(self.facts_base).union(facts))
+
+    def ask(self, question) :
+        self.begin()
+        if self.recall(question) == UNKNOWN :
+            self.OR(question)
+        answer = self.value(question) == TRUE
+        self.release()
+        return answer
+
+    def begin(self) :
+        """starts a query on the current fact base"""
+        # an interrupted query must not leave its cycle handling to the next one
+        self.release()
+        self.counter = 0
+        self.root = math.inf
+        self.on_list = []
+        self.var_successors = {}
+        self.rule_successors = {}
+
+    def release(self) :
+        """ends the last query : True and False are final for this fact base and
+        go to the memo, a variable still ON is set back to UNKNOWN so that a later
+        query of the session explores it again"""
+        for v in self.visited :
+            value = self.value(v)
+            if value == ON :
+                self.assign(v, UNKNOWN)
+            elif self.memo is not None :
+                (self.proven if value == TRUE else self.refuted).add(v)
+        self.visited = []
+
+    def recall(self, v) :
+        """value of v, taken from the memo if the state does not know it yet"""
+        value = self.value(v)
+        if value == UNKNOWN and self.memo is not None :
+            if v in self.proven :
+                value = TRUE
+                self.assign(v, TRUE)
+            elif v in self.refuted :
+                value = FALSE
+                self.assign(v, FALSE)
+        return value
+
+    def call_OR(self, P, stack) :
+        """the beginning of OR(P) : P is set ON and gets its order"""
+        self.visited.append(P)
+        self.assign(P, ON)
+        self.order[P] = self.counter
+        self.counter += 1
+        stack.append([P, self.kb.rules_for(P), 0, None, None, None, 0])
+
+    def OR(self, Q) :
+        stack = []
+        self.call_OR(Q, stack)
+        while stack :
+            self.step(stack)
+
+    def step(self, stack) :
+        """one turn of the loop of OR on the frame on top of stack : a rule of its
+        variable is tried, or its AND goes on after an antecedent was decided.
+        The whole state of OR is in stack, so OR can be stopped between two steps
+        and resumed later (cf algorithms.anytime)"""
+        frame = stack[-1]
+        P = frame[VAR]
+        R = frame[RULE]
+        output = None
+
+        if R is None :
+            # for R in kb.rules_for(P)
+            if frame[NEXT_RULE] == len(frame[RULES]) :
+                stack.pop()
+                if not frame[FLAG] :
+                    self.assign(P, FALSE)
+                    if self.order[P] == self.root :
+                        self.assignFalse()
+                return
+            R = frame[RULE] = frame[RULES][frame[NEXT_RULE]]
+            frame[NEXT_RULE] += 1
+            frame[ANTECEDENTS] = self.kb.antecedents(R)
+            frame[NEXT_ANT] = 0
+
+        elif frame[NEXT_ANT] :
+            # the AND of this frame called OR(p) on its previous antecedent, which is done
+            p = frame[ANTECEDENTS][frame[NEXT_ANT] - 1]
+            value = self.value(p)
+            if value == FALSE :
+                output = False
+            elif value == ON :
+                self.rule_successors.setdefault(R, []).append(p)
+
+        if output is None :
+            output = self.AND(R, frame, stack)
+            if output is CALLED :
+                return
+
+        # back in OR(P) with the output of AND(R)
+        frame[RULE] = None
+        if output == True :
+            stack.pop()
+            self.assign(P, TRUE)
+            self.INVERSE(P)
+            if self.order[P] == self.root :
+                self.assignFalse()
+            return
+
+        if output != False :
+            for p in output :
+                self.var_successors.setdefault(p, []).append(R)
+                if self.order[p] < self.root :
+                    self.root = self.order[p]
+            frame[FLAG] = True
+            self.counters[R] = len(output)
+            self.on_list.append(P)
+
+    def AND(self, R, frame, stack) :
+        """AND(R) from the antecedent frame[NEXT_ANT] : returns CALLED if it stopped
+        to call OR on an antecedent, else True, False or the ON antecedents of R"""
+        antecedents = frame[ANTECEDENTS]
+        for j in range(frame[NEXT_ANT], len(antecedents)) :
+            p = antecedents[j]
+            value = self.recall(p)
+            if value == TRUE :
+                continue
+            if value == UNKNOWN :
+                frame[NEXT_ANT] = j + 1
+                self.call_OR(p, stack)
+                return CALLED
+            if value == FALSE :
+                return False
+            self.rule_successors.setdefault(R, []).append(p)
+
+        successors = self.rule_successors.get(R)
+        if not successors :
+            return True
+
+        return successors
+
+    def INVERSE(self, P) :
+        heads = self.kb.heads
+        counters = self.counters
+        stack = [iter(self.var_successors.get(P, ()))]
+        while stack :
+            for R in stack[-1] :
+                counters[R] -= 1
+                if counters[R] == 0 :
+                    consequent = heads[R]
+                    # a consequent already True has already been inversed
+                    if self.value(consequent) != TRUE :
+                        self.assign(consequent, TRUE)
+                        if consequent in self.var_successors :
+                            stack.append(iter(self.var_successors[consequent]))
+                            break
+            else :
+                stack.pop()
+
+    def assignFalse(self) :
+        for p in self.on_list :
+            if self.value(p) == ON :
+                self.assign(p, FALSE)
+        self.on_list = []
+        self.counter = 0
+        self.root = math.inf
+
+
+def pre_processing(kb, facts_base, memo=None) :
+    """allocates the session of one query, the kb itself is left untouched"""
+    return BackwardSession(kb, facts_base, memo)
+
+
+def main(kb, facts_base, question) :
+    return run(kb, pre_processing(kb, facts_base), question)
+
+
+def run(kb, session, question) :
+    """backward chaining on a BackwardSession that was just allocated or reset"""
+    return session.ask(question)
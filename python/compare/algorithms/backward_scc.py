@@ -0,0 +1,181 @@
+#implementation of a backward chaining algorithm on the condensation of the dependency graph
+
+# entry :
+#  - kb : a CompiledKB (see compiled.py)
+#  - facts_base : a list of variable ids that are True (fact base)
+#  - question : the id of a variable of which we must determine the value
+
+# exit :
+#     - A : a boolean which value is True if question is a LOGICAL CONSEQUENCE of the fact base
+
+# backwardV5 finds the cycles while it explores the rules : a variable met again while
+# it is ON waits for it, and when the variable that started the cycle (root) fails,
+# assignFalse sets every waiting variable to False. On a dense cyclic base (benchmark3
+# not oriented) every variable is met again from every other one.
+# Here the cycles are found once per kb : the strongly connected components of the
+# dependency graph (graph.py, iterative Tarjan) are computed by a Condensation.
+# A query first tries a shortcut : a forward propagation inside the component of the
+# question, from its True variables, with the rules whose antecedents outside of it
+# are already True. It reads the rules of the True variables only, and it is enough
+# when the facts reach the question inside its component (benchmark3 not oriented).
+# Otherwise the query walks the consequent index back from the question to find the
+# components it depends on, then resolves them in topological order : when a component
+# is resolved, the antecedents that are outside of it are already True or False. Inside
+# a component, a rule with an antecedent False outside is dropped, the others count
+# their antecedents inside the component, and a forward propagation limited to the
+# component decides which of its variables are True. The ones that are not True are
+# False : nothing else can derive them. No variable is ever set ON nor reset.
+
+import graph
+from compiled import UNKNOWN, TRUE, FALSE, QueryState
+
+# counter of a rule that can not fire, decrementing it never reaches 0
+DROPPED = -1
+
+
+class Condensation :
+    """the strongly connected components of the dependency graph of a kb :
+    - comp : component of each variable
+    - n_comp : number of components, decreasing numbers are a topological order
+    - offsets, members : the variables of component c are members[offsets[c]:offsets[c+1]]"""
+
+    def __init__(self, kb) :
+        self.comp, self.n_comp = graph.strongly_connected_components(kb)
+        self.offsets, self.members = graph.component_members(self.comp, self.n_comp)
+
+    def component(self, c) :
+        return self.members[self.offsets[c]:self.offsets[c+1]]
+
+
+def pre_processing(kb, facts_base) :
+    """allocates the state of one query, the kb itself is left untouched"""
+    return QueryState(kb, facts_base)
+
+
+def main(kb, facts_base, question, condensation=None) :
+    if condensation is None :
+        condensation = Condensation(kb)
+    return run(kb, pre_processing(kb, facts_base), question, condensation)
+
+
+def run(kb, state, question, condensation) :
+    if state.value(question) == UNKNOWN and not shortcut(kb, state, question, condensation) :
+        for c in dependencies(kb, state, question, condensation) :
+            resolve(kb, state, c, condensation, question)
+    return state.value(question) == TRUE
+
+
+def shortcut(kb, state, question, condensation) :
+    """forward chaining inside the component of question, from its True variables,
+    with the rules whose antecedents outside of it are True. Returns True if question
+    is derived. The variables derived are set True, the counters are kept in a dict
+    so that the rules are counted again, from the state, if the component is resolved"""
+    comp = condensation.comp
+    heads = kb.heads
+    c = comp[question]
+    counters = {}
+    agenda = [v for v in condensation.component(c) if state.value(v) == TRUE]
+    for v in agenda :
+        for rule in kb.rules_of(v) :
+            consequent = heads[rule]
+            if comp[consequent] != c :
+                continue
+            if rule not in counters :
+                count = 0
+                for antecedent in kb.antecedents(rule) :
+                    if comp[antecedent] == c :
+                        count += 1
+                    elif state.value(antecedent) != TRUE :
+                        count = DROPPED
+                        break
+                counters[rule] = count
+            if counters[rule] == DROPPED :
+                continue
+            counters[rule] -= 1
+            if counters[rule] == 0 and state.value(consequent) != TRUE :
+                state.assign(consequent, TRUE)
+                if consequent == question :
+                    return True
+                agenda.append(consequent)
+    return False
+
+
+def dependencies(kb, state, question, condensation) :
+    """components the question depends on and that are not decided yet,
+    in topological order (the component of the question is the last one)"""
+    comp = condensation.comp
+    seen = {comp[question]}
+    stack = [comp[question]]
+    while stack :
+        c = stack.pop()
+        for v in condensation.component(c) :
+            for rule in kb.rules_for(v) :
+                for antecedent in kb.antecedents(rule) :
+                    d = comp[antecedent]
+                    if d not in seen and state.value(antecedent) == UNKNOWN :
+                        seen.add(d)
+                        stack.append(d)
+    return sorted(seen, reverse=True)
+
+
+def resolve(kb, state, c, condensation, question=None) :
+    """sets every variable of component c to True or False, the components
+    it depends on must be resolved. Stops as soon as question is True"""
+    agenda = [v for v in condensation.component(c) if state.value(v) == TRUE]
+    if propagate(kb, state, agenda, c, condensation, question) :
+        return
+
+    # the rules fired by the antecedents outside the component only
+    for v in condensation.component(c) :
+        if state.value(v) == TRUE :
+            continue
+        for rule in kb.rules_for(v) :
+            if counter(kb, state, rule, c, condensation) == 0 :
+                state.assign(v, TRUE)
+                if propagate(kb, state, [v], c, condensation, question) :
+                    return
+                break
+
+    for v in condensation.component(c) :
+        if state.value(v) != TRUE :
+            state.assign(v, FALSE)
+
+
+def counter(kb, state, rule, c, condensation) :
+    """counter of a rule of component c, set the first time the rule is met :
+    the number of its antecedents inside c, DROPPED if one outside is not True.
+    Its antecedents inside c that are True have not been propagated yet, or
+    the rule would have been met"""
+    if state.rule_stamp[rule] != state.epoch :
+        count = 0
+        for antecedent in kb.antecedents(rule) :
+            if condensation.comp[antecedent] == c :
+                count += 1
+            elif state.value(antecedent) != TRUE :
+                count = DROPPED
+                break
+        state.rule_stamp[rule] = state.epoch
+        state.counters[rule] = count
+    return state.counters[rule]
+
+
+def propagate(kb, state, agenda, c, condensation, question) :
+    """forward chaining inside component c from the variables of agenda,
+    that are True. Returns True if question is derived"""
+    comp = condensation.comp
+    heads = kb.heads
+    counters = state.counters
+    if question in agenda :
+        return True
+    for v in agenda :
+        for rule in kb.rules_of(v) :
+            consequent = heads[rule]
+            if comp[consequent] != c or counter(kb, state, rule, c, condensation) == DROPPED :
+                continue
+            counters[rule] -= 1
+            if counters[rule] == 0 and state.value(consequent) != TRUE :
+                state.assign(consequent, TRUE)
+                if consequent == question :
+                    return True
+                agenda.append(consequent)
+    return False
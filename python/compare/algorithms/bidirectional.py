@@ -0,0 +1,157 @@
+#implementation of a bidirectional chaining algorithm : forward from the facts and backward from the question
+
+# entry :
+#  - kb : a CompiledKB (see compiled.py)
+#  - facts_base : a list of variable ids that are True (fact base)
+#  - question : the id of a variable of which we must determine the value
+
+# exit :
+#     - A : a boolean which value is True if question is a LOGICAL CONSEQUENCE of the fact base
+
+# Two searches run in turn, one step at a time, and the one with the smallest
+# frontier goes on :
+# - the forward side is forward_compiled : the frontier is the part of the agenda
+#   that has not been read yet, a rule whose counter reaches 0 makes its consequent True
+# - the backward side expands goals from the question through the consequent index,
+#   depth first and one rule at a time as backwardV5 does : the frontier is the number
+#   of goals of the stack that still have rules to explore. Exploring a rule makes its
+#   antecedents that are not True goals, on top of the stack, and the rule waits for
+#   them : its proof counter is the number of its antecedents that are not True.
+# Every variable set True, by either side, is added to the forward agenda and decrements
+# the proof counter of the explored rules waiting for it : a rule whose proof counter
+# reaches 0 makes its consequent True at once, so a proof of the question is closed as
+# soon as the True variables cover an AND-OR tree of explored rules, whatever the order
+# of the forward agenda.
+# The question is False when one side is exhausted : the forward side has then derived
+# everything, or the backward side has explored every rule the question depends on,
+# and the proof counters have derived every variable of these rules that can be.
+# Each side reads a variable and explores a rule at most once.
+
+from array import array
+
+from compiled import MAX_EPOCH, TRUE, QueryState
+
+
+class BidirectionalState(QueryState) :
+    """a QueryState with the backward side :
+    - goal_stamp : epoch at which each variable became a goal
+    - next_rule : position in kb.csq_rules of the next rule of each goal, set when it becomes a goal
+    - proof : proof counter of each explored rule, set when it is explored"""
+
+    def __init__(self, kb, facts_base=()) :
+        self.goal_stamp = array('I', [0]) * kb.n_vars
+        self.next_rule = array('i', [0]) * kb.n_vars
+        self.proof = array('i', [0]) * kb.n_rules
+        QueryState.__init__(self, kb, facts_base)
+
+    def reset(self, facts_base=()) :
+        if self.epoch == MAX_EPOCH :
+            self.goal_stamp = array('I', [0]) * len(self.goal_stamp)
+        QueryState.reset(self, facts_base)
+
+
+def pre_processing(kb, facts_base) :
+    """allocates the state of one query, the kb itself is left untouched"""
+    return BidirectionalState(kb, facts_base)
+
+
+def main(kb, facts_base, question) :
+    return run(kb, pre_processing(kb, facts_base), question)
+
+
+def run(kb, state, question) :
+    """bidirectional chaining on a BidirectionalState that was just allocated or reset"""
+    epoch = state.epoch
+    counters = state.counters
+    rule_stamp = state.rule_stamp
+    values = state.values
+    var_stamp = state.var_stamp
+    goal_stamp = state.goal_stamp
+    next_rule = state.next_rule
+    proof = state.proof
+    if state.value(question) == TRUE :
+        return True
+
+    heads = kb.heads
+    body_len = kb.body_len
+    ant_offsets = kb.ant_offsets
+    ant_rules = kb.ant_rules
+    csq_offsets = kb.csq_offsets
+    csq_rules = kb.csq_rules
+    body_offsets = kb.body_offsets
+    body_vars = kb.body_vars
+
+    agenda = state.agenda
+    read = 0            # position of the forward side in agenda
+    goals = [question]
+    goal_stamp[question] = epoch
+    next_rule[question] = csq_offsets[question]
+    # goals of the stack with rules left to explore
+    open_goals = 1 if csq_offsets[question] != csq_offsets[question+1] else 0
+    waiting = {}        # variable : explored rules it is a not True antecedent of
+
+    def derive(variable) :
+        """sets a variable True, and closes the proofs it completes"""
+        values[variable] = TRUE
+        var_stamp[variable] = epoch
+        agenda.append(variable)
+        stack = [variable]
+        while stack :
+            for rule in waiting.pop(stack.pop(), ()) :
+                proof[rule] -= 1
+                if proof[rule] == 0 :
+                    consequent = heads[rule]
+                    if var_stamp[consequent] != epoch :
+                        values[consequent] = TRUE
+                        var_stamp[consequent] = epoch
+                        agenda.append(consequent)
+                        stack.append(consequent)
+
+    while var_stamp[question] != epoch :
+        forward_frontier = len(agenda) - read
+        if forward_frontier == 0 or not goals :
+            return False
+
+        if forward_frontier <= open_goals :
+            variable = agenda[read]
+            read += 1
+            for rule in ant_rules[ant_offsets[variable]:ant_offsets[variable+1]] :
+                if rule_stamp[rule] != epoch :
+                    rule_stamp[rule] = epoch
+                    counters[rule] = body_len[rule] - 1
+                else :
+                    counters[rule] -= 1
+                if counters[rule] == 0 and var_stamp[heads[rule]] != epoch :
+                    derive(heads[rule])
+            continue
+
+        goal = goals[-1]
+        if next_rule[goal] == csq_offsets[goal+1] :
+            goals.pop()
+            continue
+        # a goal proven meanwhile needs no other rule
+        if var_stamp[goal] == epoch :
+            goals.pop()
+            open_goals -= 1
+            continue
+        rule = csq_rules[next_rule[goal]]
+        next_rule[goal] += 1
+        if next_rule[goal] == csq_offsets[goal+1] :
+            open_goals -= 1
+        count = 0
+        # reversed : the first antecedent ends on top of the stack
+        for antecedent in reversed(body_vars[body_offsets[rule]:body_offsets[rule+1]]) :
+            if var_stamp[antecedent] != epoch :
+                count += 1
+                waiting.setdefault(antecedent, []).append(rule)
+                if goal_stamp[antecedent] != epoch :
+                    goal_stamp[antecedent] = epoch
+                    next_rule[antecedent] = csq_offsets[antecedent]
+                    goals.append(antecedent)
+                    if csq_offsets[antecedent] != csq_offsets[antecedent+1] :
+                        open_goals += 1
+        proof[rule] = count
+        if count == 0 :
+            derive(goal)
+
+    return True
@@ -0,0 +1,171 @@
+#implementation of a bit-parallel forward chaining algorithm : one rule base, many fact bases
+
+# entry :
+#  - kb : a CompiledKB (see compiled.py)
+#  - fact_bases : a list of fact bases, each one a list of variable ids (or names)
+#  - question : the id of a variable of which we must determine the value
+
+# exit :
+#     - A : an array of booleans, A[b] is True if question is a LOGICAL CONSEQUENCE
+#           of the fact base fact_bases[b]
+
+# Fact base b is the bit b%64 of the word b//64 : each variable holds a row of
+# uint64 words (its lanes), bit set meaning the variable is True for that fact base.
+# A rule fires in every lane at once : the lanes of its consequent are OR-ed with
+# the AND of the lanes of its antecedents.
+
+# The rules are evaluated level by level along the condensation of the dependency
+# graph (cf graph.py) : when the rules of level L are evaluated, the lanes of every
+# variable of a lower level are final. A rule whose antecedents are all in lower
+# levels is thus evaluated exactly once, only the rules inside a cycle (an antecedent
+# in the same component as the consequent) are evaluated again, by waves : only the
+# ones having an antecedent that gained lanes in the previous wave. Every level and
+# every wave is a single vectorized step over all its rules.
+# A component whose cycles are only made of rules with a single antecedent (a ring
+# of benchmark1 style rules, the whole benchmark3) needs no wave : all its variables
+# reach each other, so they all get the OR of the lanes of the component.
+
+import numpy as np
+
+import graph
+from vectorized import as_numpy, concatenated_ranges
+
+WORD = 64
+
+
+class Plan :
+    """the order in which the rules of a kb are evaluated, computed once per kb :
+    - var_level : level of the component of each variable
+    - acyclic[L] : rules of level L whose antecedents all have a lower level
+    - cyclic[L] : rules of level L with an antecedent in the component of the consequent,
+                  except the rules inside unit components
+    - is_cyclic : mask of the rules of every cyclic[L]
+    - unit_members[L], unit_starts[L] : the variables of the unit components of level L,
+                  grouped by component, and the start of each group"""
+
+    def __init__(self, kb) :
+        comp, n_comp = graph.strongly_connected_components(kb)
+        level = np.frombuffer(graph.component_levels(kb, comp, n_comp), dtype=np.int32)
+        comp = np.frombuffer(comp, dtype=np.int32)
+
+        body_offsets = as_numpy(kb.body_offsets)
+        body_vars = as_numpy(kb.body_vars)
+        heads = as_numpy(kb.heads)
+        body_len = np.diff(body_offsets)
+
+        self.var_level = level[comp]
+        rule_level = self.var_level[heads]
+        rule_of_entry = np.repeat(np.arange(kb.n_rules), body_len)
+        same = comp[body_vars] == comp[heads[rule_of_entry]]
+        internal = np.bincount(rule_of_entry, weights=same, minlength=kb.n_rules) > 0
+
+        # unit components : several variables, every internal rule has one antecedent
+        unit_comp = np.bincount(comp, minlength=n_comp) > 1
+        unit_comp[comp[heads[internal & (body_len > 1)]]] = False
+        in_unit_comp = unit_comp[comp[heads]]
+        self.is_cyclic = internal & ~in_unit_comp
+
+        n_levels = int(level.max()) + 1 if n_comp else 0
+        order = np.argsort(rule_level, kind='stable')
+        bounds = np.searchsorted(rule_level[order], np.arange(n_levels + 1))
+        self.acyclic = []
+        self.cyclic = []
+        for L in range(n_levels) :
+            rules = order[bounds[L]:bounds[L+1]]
+            self.acyclic.append(rules[~internal[rules]])
+            self.cyclic.append(rules[self.is_cyclic[rules]])
+
+        unit_vars = np.flatnonzero(unit_comp[comp])
+        unit_vars = unit_vars[np.lexsort((comp[unit_vars], self.var_level[unit_vars]))]
+        bounds = np.searchsorted(self.var_level[unit_vars], np.arange(n_levels + 1))
+        self.unit_members = []
+        self.unit_starts = []
+        for L in range(n_levels) :
+            members = unit_vars[bounds[L]:bounds[L+1]]
+            groups = comp[members]
+            self.unit_members.append(members)
+            self.unit_starts.append(np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]]) if members.size else members)
+
+
+def pack_fact_bases(kb, fact_bases) :
+    """returns the lanes of every variable : an array (n_vars, n_words) of uint64"""
+    n_words = max(1, (len(fact_bases) + WORD - 1) // WORD)
+    lanes = np.zeros((kb.n_vars, n_words), dtype=np.uint64)
+    for b, facts_base in enumerate(fact_bases) :
+        bit = np.uint64(1) << np.uint64(b % WORD)
+        for variable in facts_base :
+            if not isinstance(variable, (int, np.integer)) :
+                variable = kb.id_of(variable)
+            lanes[variable, b // WORD] |= bit
+    return lanes
+
+
+def lanes_to_bools(row, n_bases) :
+    """the lanes of one variable as an array of n_bases booleans"""
+    bits = np.unpackbits(row.astype('<u8').view(np.uint8), bitorder='little')
+    return bits[:n_bases].astype(bool)
+
+
+def fire(kb, lanes, rules) :
+    """evaluates the rules in every lane, returns the consequents that gained lanes"""
+    body_offsets = as_numpy(kb.body_offsets)
+    targets = as_numpy(kb.heads)[rules]
+
+    starts = body_offsets[rules]
+    ends = body_offsets[rules + 1]
+    # a rule without antecedent holds in every lane, reduceat only gets the other ones
+    # (an empty segment would take the next entry, or be out of range at the end)
+    fired = np.full((rules.size, lanes.shape[1]), np.iinfo(np.uint64).max, dtype=np.uint64)
+    nonempty = starts != ends
+    if nonempty.any() :
+        starts = starts[nonempty]
+        ends = ends[nonempty]
+        entries = concatenated_ranges(starts, ends)
+        segments = np.cumsum(ends - starts) - (ends - starts)
+        fired[nonempty] = np.bitwise_and.reduceat(lanes[as_numpy(kb.body_vars)[entries]], segments, axis=0)
+
+    consequents = np.unique(targets)
+    before = lanes[consequents]
+    np.bitwise_or.at(lanes, targets, fired)
+    return consequents[(lanes[consequents] != before).any(axis=1)]
+
+
+def forward_closure(kb, lanes, plan=None, question=None) :
+    """computes the closure of every lane in place.
+    If question is given, stops once its level has been evaluated"""
+
+    if plan is None :
+        plan = Plan(kb)
+    last = len(plan.acyclic) - 1
+    if question is not None :
+        last = int(plan.var_level[question])
+
+    ant_offsets = as_numpy(kb.ant_offsets)
+    ant_rules = as_numpy(kb.ant_rules)
+
+    for L in range(last + 1) :
+        if plan.acyclic[L].size :
+            fire(kb, lanes, plan.acyclic[L])
+
+        members = plan.unit_members[L]
+        if members.size :
+            starts = plan.unit_starts[L]
+            union = np.bitwise_or.reduceat(lanes[members], starts, axis=0)
+            lanes[members] = np.repeat(union, np.diff(np.r_[starts, members.size]), axis=0)
+
+        rules = plan.cyclic[L]
+        while rules.size :
+            changed = fire(kb, lanes, rules)
+            # next wave : the cyclic rules of this level that have a changed antecedent
+            rules = np.unique(ant_rules[concatenated_ranges(ant_offsets[changed], ant_offsets[changed + 1])])
+            rules = rules[plan.is_cyclic[rules] & (plan.var_level[as_numpy(kb.heads)[rules]] == L)]
+
+    return lanes
+
+
+def forward_algorithm(kb, fact_bases, question, plan=None) :
+    if not isinstance(question, (int, np.integer)) :
+        question = kb.id_of(question)
+    lanes = pack_fact_bases(kb, fact_bases)
+    forward_closure(kb, lanes, plan, question)
+    return lanes_to_bools(lanes[question], len(fact_bases))
@@ -0,0 +1,250 @@
+#implementation of the linear forward chaining algorithm (forwardV3) on a compiled knowledge base
+
+# entry :
+#  - kb : a CompiledKB (see compiled.py)
+#  - facts_base : a list of variable ids that are True (fact base)
+#  - question : the id of a variable of which we must determine the value
+
+# exit :
+#     - A : a boolean which value is True if question is a LOGICAL CONSEQUENCE of the fact base
+
+# Rules and variables are integers, rule.counter and variable.value live in a
+# compiled.QueryState : the compiled kb is built once, is read-only and never needs
+# to be reset nor pre-processed again. A state can be reused by calling
+# state.reset(facts_base), values and counters carrying an older epoch stamp are
+# then treated as never written.
+
+from compiled import TRUE, QueryState
+from classes import et
+
+
+def pre_processing(kb, facts_base) :
+    """allocates the state of one query (rule counters, values of the variables),
+    the kb itself is left untouched so this can be called once per query"""
+    return QueryState(kb, facts_base)
+
+
+def forward_algorithm(kb, facts_base, question) :
+    return run(kb, pre_processing(kb, facts_base), question)
+
+
+def run(kb, state, question) :
+    """forward chaining on a QueryState that was just allocated or reset"""
+    if state.value(question) == TRUE :
+        return True
+    return closure(kb, state, question) is not None
+
+
+def closure(kb, state, stop=-1, derived=None) :
+    """propagates the facts of a QueryState that was just allocated or reset : every
+    variable derived is set True and appended to state.agenda. Returns the rule whose
+    counter reached 0 when its consequent is stop (stop is then not set True and the
+    propagation ends there), None when the closure is complete.
+    derived, if given, is called with each variable set True, the propagation ends
+    (and None is returned) as soon as it returns True"""
+    epoch = state.epoch
+    counters = state.counters
+    rule_stamp = state.rule_stamp
+    values = state.values
+    var_stamp = state.var_stamp
+    agenda = state.agenda
+
+    ant_offsets = kb.ant_offsets
+    ant_rules = kb.ant_rules
+    heads = kb.heads
+    body_len = kb.body_len
+
+    # the agenda grows while it is read, as facts_base does in forwardV3
+    for variable in agenda :
+        for rule in ant_rules[ant_offsets[variable]:ant_offsets[variable+1]] :
+            if rule_stamp[rule] != epoch :
+                rule_stamp[rule] = epoch
+                counters[rule] = body_len[rule] - 1
+            else :
+                counters[rule] -= 1
+            if counters[rule] == 0 :
+                consequent = heads[rule]
+                if consequent == stop :
+                    return rule
+                # in the forward algorithm a stamped variable is a True one
+                if var_stamp[consequent] != epoch :
+                    values[consequent] = TRUE
+                    var_stamp[consequent] = epoch
+                    agenda.append(consequent)
+                    if derived is not None and derived(consequent) :
+                        return None
+
+    return None
+
+
+
+# Relevance slicing : only a rule whose consequent is the question, or an antecedent of
+# a rule of the slice, can help to derive the question. The slice is found by walking
+# the consequent index (kb.rules_for) back from the question, and it is stored as
+# {variable : [rules of the slice of which it is an antecedent]} : the propagation
+# only decrements the counters of these rules, and does not visit the rules of the
+# variables that are in no rule of the slice. A slice only depends on the kb and the
+# question, a SliceCache keeps them for the next queries.
+
+def relevance_slice(kb, question) :
+    """returns {variable : [rules]}, the rules of the slice of question
+    of which each variable is an antecedent"""
+    relevant = {}
+    seen = bytearray(kb.n_vars)
+    seen[question] = 1
+    stack = [question]
+    while stack :
+        variable = stack.pop()
+        for rule in kb.rules_for(variable) :
+            for antecedent in kb.antecedents(rule) :
+                relevant.setdefault(antecedent, []).append(rule)
+                if not seen[antecedent] :
+                    seen[antecedent] = 1
+                    stack.append(antecedent)
+    return relevant
+
+
+class SliceCache :
+    """the relevance slices of the questions asked to a kb"""
+
+    def __init__(self, kb) :
+        self.kb = kb
+        self.slices = {}
+
+    def get(self, question) :
+        if question not in self.slices :
+            self.slices[question] = relevance_slice(self.kb, question)
+        return self.slices[question]
+
+
+def forward_sliced(kb, facts_base, question, cache=None) :
+    relevant = cache.get(question) if cache is not None else relevance_slice(kb, question)
+    return run_sliced(kb, pre_processing(kb, facts_base), question, relevant)
+
+
+def run_sliced(kb, state, question, relevant) :
+    """forward chaining restricted to the rules of a relevance slice"""
+    epoch = state.epoch
+    counters = state.counters
+    rule_stamp = state.rule_stamp
+    values = state.values
+    var_stamp = state.var_stamp
+    agenda = state.agenda
+    if state.value(question) == TRUE :
+        return True
+
+    heads = kb.heads
+    body_len = kb.body_len
+
+    for variable in agenda :
+        for rule in relevant.get(variable, ()) :
+            if rule_stamp[rule] != epoch :
+                rule_stamp[rule] = epoch
+                counters[rule] = body_len[rule] - 1
+            else :
+                counters[rule] -= 1
+            if counters[rule] == 0 :
+                consequent = heads[rule]
+                if consequent == question :
+                    return True
+                if var_stamp[consequent] != epoch :
+                    values[consequent] = TRUE
+                    var_stamp[consequent] = epoch
+                    agenda.append(consequent)
+
+    return False
+
+
+# Batch mode : one forward propagation answers a whole list of questions.
+# A question is a variable (id, name or Variable object) or a classes.Question.
+# Each question is turned into expressions (conjunctions or disjunctions of variables)
+# that count how many of their variables must still become True, and each question
+# counts how many of its expressions must still be satisfied. Since the forward
+# algorithm only ever sets variables to True, a question that is True stays True :
+# the propagation (closure, with a derived callback) stops as soon as every question
+# is True, the questions still undecided when the closure is complete are False.
+
+def compile_questions(kb, questions) :
+    """returns (watchers, needed, owner, remaining) :
+    - watchers : {variable : [expressions]} the expressions a variable appears in
+    - needed : number of True variables each expression still needs
+    - owner : the question of each expression
+    - remaining : number of satisfied expressions each question still needs"""
+
+    watchers = {}
+    needed = []
+    owner = []
+    remaining = []
+
+    def add_expression(variables, connector, question) :
+        expression = len(needed)
+        ids = set()
+        for variable in variables :
+            v = variable if isinstance(variable, int) else kb.index.get(variable if isinstance(variable, str) else variable.name)
+            if v is not None :
+                ids.add(v)
+            elif connector == et :
+                # a variable the kb does not know can never be True
+                ids = None
+                break
+        if not ids :
+            needed.append(-1)
+        else :
+            needed.append(len(ids) if connector == et else 1)
+            for v in ids :
+                watchers.setdefault(v, []).append(expression)
+        owner.append(question)
+
+    for question, q in enumerate(questions) :
+        if hasattr(q, 'expressions') :
+            for expression in q.expressions :
+                add_expression(expression.vars, expression.connector, question)
+            if q.connector == et :
+                remaining.append(len(q.expressions))
+            else :
+                remaining.append(1 if q.expressions else -1)
+        else :
+            add_expression([q], et, question)
+            remaining.append(1)
+
+    return watchers, needed, owner, remaining
+
+
+def forward_batch(kb, facts_base, questions) :
+    """answers every question with a single forward propagation from facts_base,
+    returns the list of the answers (booleans) in the order of questions"""
+
+    watchers, needed, owner, remaining = compile_questions(kb, questions)
+    answers = [False] * len(questions)
+    undecided = sum(1 for r in remaining if r > 0)
+
+    state = QueryState(kb, facts_base)
+
+    def notify(variable) :
+        """the variable became True, returns the number of questions it decides"""
+        decided = 0
+        for expression in watchers[variable] :
+            needed[expression] -= 1
+            if needed[expression] == 0 :
+                question = owner[expression]
+                remaining[question] -= 1
+                if remaining[question] == 0 :
+                    answers[question] = True
+                    decided += 1
+        return decided
+
+    for variable in state.agenda :
+        if variable in watchers :
+            undecided -= notify(variable)
+    if undecided == 0 :
+        return answers
+
+    def derived(variable) :
+        """True once every question is True"""
+        nonlocal undecided
+        if variable in watchers :
+            undecided -= notify(variable)
+        return undecided == 0
+
+    closure(kb, state, derived=derived)
+    return answers
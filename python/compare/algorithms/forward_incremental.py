@@ -0,0 +1,181 @@
+#implementation of an incremental forward chaining algorithm : a closure that facts and rules are added to
+
+# entry :
+#  - rules : Rule objects, given when the session is created or later with add_rules
+#  - facts_base : variables (names or Variable objects) that are True, given when the
+#                 session is created or later with add_facts
+#  - question : a variable (name or Variable object) of which we must determine the value
+
+# exit :
+#     - A : a boolean which value is True if question is a LOGICAL CONSEQUENCE of the fact base,
+#           session.ask(question), at any time
+
+# Same counters as forwardV3, but they are never reset : a ForwardSession keeps the
+# closure of everything it has been given. The counter of a rule is the number of its
+# antecedents that are not True yet, and a variable is True when it is a fact or the
+# consequent of a rule whose counter is 0.
+# add_facts only propagates the new facts, through the rules they are antecedents of.
+# add_rules gives a new rule the number of its antecedents that are not True yet : a rule
+# whose antecedents are already all True fires at once, the others wait for the
+# propagation like the rules given at the start.
+# Variables and rules are numbered in the order they are met, and the session grows
+# its lists as they come, so a rule may use a variable never seen before.
+
+# retract_facts removes facts with the delete and rederive (DRed) method : the support
+# of a variable is the number of rules of which it is the consequent and whose counter
+# is 0. First every variable that may depend on a retracted fact is deleted : the
+# counters of the rules of a deleted variable go up, and the consequent of a rule that
+# stops firing is deleted too, unless it is a fact. Then the deleted variables that still
+# have a support (a rule whose antecedents were all kept) are True again, and they are
+# propagated as new facts, which rederives the deleted variables that had an other way
+# to be derived. Only the rules of the deleted variables are visited.
+
+from array import array
+
+
+class ForwardSession :
+    """the closure of a growing rule base and fact base :
+    - names, index : name of each variable and {name : variable}
+    - var_rules : rules of which each variable is an antecedent
+    - bodies, heads : antecedents (without duplicates) and consequent of each rule
+    - counters : number of antecedents of each rule that are not True
+    - values : 1 if the variable is True, else 0
+    - support : number of rules of which each variable is the consequent, with a counter at 0
+    - facts : variables given as facts"""
+
+    def __init__(self, rules=(), facts_base=()) :
+        self.names = []
+        self.index = {}
+        self.var_rules = []
+        self.bodies = []
+        self.heads = array('i')
+        self.counters = array('i')
+        self.values = bytearray()
+        self.support = array('i')
+        self.facts = set()
+        self.add_rules(rules)
+        self.add_facts(facts_base)
+
+    def id_of(self, variable) :
+        """number of a variable (name or Variable object), it is created if needed"""
+        name = variable if isinstance(variable, str) else variable.name
+        v = self.index.get(name)
+        if v is None :
+            v = self.index[name] = len(self.names)
+            self.names.append(name)
+            self.var_rules.append([])
+            self.values.append(0)
+            self.support.append(0)
+        return v
+
+    def add_facts(self, facts) :
+        """adds facts and propagates them, returns the names of the variables
+        that became True"""
+        agenda = []
+        for variable in facts :
+            v = self.id_of(variable)
+            self.facts.add(v)
+            if not self.values[v] :
+                self.values[v] = 1
+                agenda.append(v)
+        return self.propagate(agenda)
+
+    def add_rules(self, rules) :
+        """adds Rule objects, fires those whose antecedents are all True and
+        propagates their consequents, returns the names of the variables that
+        became True"""
+        derived = []
+        for rule in rules :
+            r = len(self.bodies)
+            body = []
+            for antecedent in rule.antecedents :
+                v = self.id_of(antecedent)
+                if v not in body :
+                    body.append(v)
+            head = self.id_of(rule.consequent)
+            self.bodies.append(body)
+            self.heads.append(head)
+
+            counter = 0
+            for v in body :
+                self.var_rules[v].append(r)
+                if not self.values[v] :
+                    counter += 1
+            self.counters.append(counter)
+
+            # propagated before the next rule is added : a counter must only skip
+            # the antecedents that have already been propagated
+            if counter == 0 :
+                self.support[head] += 1
+                if not self.values[head] :
+                    self.values[head] = 1
+                    derived += self.propagate([head])
+        return derived
+
+    def propagate(self, agenda) :
+        """forward chaining from the variables of agenda, that were just set True"""
+        var_rules = self.var_rules
+        counters = self.counters
+        heads = self.heads
+        values = self.values
+        support = self.support
+
+        # the agenda grows while it is read, as facts_base does in forwardV3
+        for variable in agenda :
+            for rule in var_rules[variable] :
+                counters[rule] -= 1
+                if counters[rule] == 0 :
+                    consequent = heads[rule]
+                    support[consequent] += 1
+                    if not values[consequent] :
+                        values[consequent] = 1
+                        agenda.append(consequent)
+        return [self.names[v] for v in agenda]
+
+    def retract_facts(self, facts) :
+        """removes facts from the fact base, returns the names of the variables
+        that are not True anymore"""
+        var_rules = self.var_rules
+        counters = self.counters
+        heads = self.heads
+        values = self.values
+        support = self.support
+
+        deleted = []
+        for variable in facts :
+            v = self.index.get(variable if isinstance(variable, str) else variable.name)
+            if v in self.facts :
+                self.facts.remove(v)
+                values[v] = 0
+                deleted.append(v)
+
+        # over-deletion : everything derived through a deleted variable
+        for variable in deleted :
+            for rule in var_rules[variable] :
+                counters[rule] += 1
+                if counters[rule] == 1 :
+                    consequent = heads[rule]
+                    support[consequent] -= 1
+                    if values[consequent] and consequent not in self.facts :
+                        values[consequent] = 0
+                        deleted.append(consequent)
+
+        # rederivation : from the deleted variables that still have a support
+        agenda = []
+        for variable in deleted :
+            if support[variable] and not values[variable] :
+                values[variable] = 1
+                agenda.append(variable)
+        self.propagate(agenda)
+
+        return [self.names[v] for v in deleted if not values[v]]
+
+    def ask(self, question) :
+        """True if question is a logical consequence of the facts and rules given so far"""
+        name = question if isinstance(question, str) else question.name
+        v = self.index.get(name)
+        return v is not None and self.values[v] == 1
+
+    def true_names(self) :
+        """names of every True variable (facts included)"""
+        return [self.names[v] for v in range(len(self.names)) if self.values[v]]
@@ -0,0 +1,112 @@
+#implementation of a forward chaining algorithm that computes the whole least model once, for many questions
+
+# entry :
+#  - rules : Rule objects
+#  - facts_base : variables (names or Variable objects) that are True (fact base)
+#  - question : a variable (name or Variable object) of which we must determine the value
+
+# exit :
+#     - A : a boolean which value is True if question is a LOGICAL CONSEQUENCE of the fact base,
+#           model.is_true(question)
+
+# forwardV3 stops as soon as the question is derived, and starts again for the next
+# question. Here materialize() runs the propagation of forward_compiled to the end
+# (forward_compiled.closure), without a question : every variable True in the least
+# model of the rules and the facts is derived once, and the model is kept as a
+# bytearray indexed by the ids of the compiled kb. is_true(question) is then a lookup
+# in a dict and in the bytearray, and true_set() is built once per model.
+# The model is only computed again when the facts or the rules change, and not even
+# then when the change can not modify it : a fact that is already True, or a rule
+# whose consequent is True or whose antecedents are not all True, leaves the least
+# model as it is. The rules are compiled again only when the model is computed again.
+
+from compiled import TRUE, QueryState, compile_rules
+from algorithms.forward_compiled import closure
+
+
+class MaterializedModel :
+    """the least model of a rule base and a fact base, computed when needed :
+    - rules : Rule objects
+    - facts : names of the facts, as the keys of a dict (in the order they were given)
+    - kb : the CompiledKB of the rules when the model was computed, None if they were replaced
+    - values : 1 for the variables of kb in the model, else 0. None when the model
+      is not valid anymore"""
+
+    def __init__(self, rules=(), facts_base=()) :
+        self.rules = list(rules)
+        self.facts = dict.fromkeys(name_of(variable) for variable in facts_base)
+        self.kb = None
+        self.values = None
+        self.names = None
+
+    def materialize(self) :
+        """computes the least model if it is not valid, returns the bytearray of the values"""
+        if self.values is not None :
+            return self.values
+        if self.kb is None or self.kb.n_rules != len(self.rules) :
+            self.kb = compile_rules(self.rules)
+        kb = self.kb
+        facts = [kb.index[name] for name in self.facts if name in kb.index]
+        state = QueryState(kb, facts)
+        closure(kb, state)
+
+        values = bytearray(kb.n_vars)
+        for variable in state.agenda :
+            values[variable] = TRUE
+        self.values = values
+        self.names = None
+        return values
+
+    def is_true(self, variable) :
+        """True if variable (name or Variable object) is in the least model"""
+        name = name_of(variable)
+        values = self.materialize()
+        v = self.kb.index.get(name)
+        if v is None :
+            # a fact that is in no rule
+            return name in self.facts
+        return values[v] == TRUE
+
+    def true_set(self) :
+        """names of the variables of the least model (facts included), as a frozenset"""
+        values = self.materialize()
+        if self.names is None :
+            names = self.kb.names
+            self.names = frozenset([names[v] for v in range(len(values)) if values[v]]).union(self.facts)
+        return self.names
+
+    def add_facts(self, facts) :
+        for variable in facts :
+            name = name_of(variable)
+            if name not in self.facts :
+                if self.values is not None and not self.is_true(name) :
+                    self.values = None
+                self.facts[name] = None
+                # the facts in no rule are in true_set
+                self.names = None
+
+    def retract_facts(self, facts) :
+        names = {name_of(variable) for variable in facts}
+        kept = {name : None for name in self.facts if name not in names}
+        if len(kept) != len(self.facts) :
+            self.facts = kept
+            self.values = None
+            self.names = None
+
+    def add_rules(self, rules) :
+        for rule in rules :
+            if self.values is not None and not self.is_true(rule.consequent) :
+                if all(self.is_true(antecedent) for antecedent in rule.antecedents) :
+                    self.values = None
+            # compiled with the other ones when the model is computed again
+            self.rules.append(rule)
+
+    def set_rules(self, rules) :
+        self.rules = list(rules)
+        self.kb = None
+        self.values = None
+        self.names = None
+
+
+def name_of(variable) :
+    return variable if isinstance(variable, str) else variable.name
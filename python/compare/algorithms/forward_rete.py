@@ -0,0 +1,139 @@
+#implementation of a forward chaining algorithm on a network of shared joins (Rete beta network)
+
+# entry :
+#  - kb : a CompiledKB (see compiled.py)
+#  - facts_base : a list of variable ids that are True (fact base)
+#  - question : the id of a variable of which we must determine the value
+
+# exit :
+#     - A : a boolean which value is True if question is a LOGICAL CONSEQUENCE of the fact base
+
+# In forwardV3 every rule has its own counter : when k rules share the antecedents
+# P0 ∧ ... ∧ P(n-1), each of the n facts decrements k counters, n*k decrements for
+# one conjunction. Here the bodies are factored once per kb by a ReteNetwork : the
+# antecedents of every rule are sorted in the same order (the most used variables
+# first), and each prefix of a sorted body is a join of two inputs, the previous
+# prefix and the next antecedent. Two rules with the same prefix share its joins, so
+# the conjunction P0 ∧ ... ∧ P(n-1) is n-1 joins whatever the number of rules it
+# starts. An input is a variable or a join, a join is True when its two inputs are,
+# and a rule fires when the input that stands for its whole body is True (a rule with
+# a single antecedent hangs on the variable itself).
+# The forward chaining is the one of forward_compiled, on inputs : the agenda holds
+# variables and joins. A join has two inputs and each of them is set True once : a
+# join is stamped with the epoch when its first input is True, and it is True when
+# the second one is, so it needs no counter. The consequents of the rules hanging on
+# an input are set True when it is.
+
+from array import array
+
+from compiled import MAX_EPOCH, TRUE, QueryState, build_csr
+
+
+class ReteNetwork :
+    """the bodies of the rules of a kb as joins of two inputs, built once per kb.
+    Inputs 0 .. n_vars-1 are the variables, input n_vars + j is join j :
+    - n_joins : number of joins
+    - left, right : the two inputs of each join
+    - succ_offsets, succ_joins : joins each input is an input of
+    - term_offsets, term_heads : consequents of the rules whose body is each input"""
+
+    def __init__(self, kb) :
+        n_vars = kb.n_vars
+        # the most used variables first : they start the longest shared prefixes
+        uses = [kb.ant_offsets[v+1] - kb.ant_offsets[v] for v in range(n_vars)]
+        rank = array('i', [0]) * n_vars
+        for position, v in enumerate(sorted(range(n_vars), key=lambda v : -uses[v])) :
+            rank[v] = position
+
+        joins = {}          # (left, right) : input of the join
+        self.left = array('i')
+        self.right = array('i')
+        term_inputs = array('i')
+        term_heads = array('i')
+        for rule in range(kb.n_rules) :
+            body = sorted(kb.antecedents(rule), key=rank.__getitem__)
+            if not body :
+                continue
+            node = body[0]
+            for antecedent in body[1:] :
+                key = (node, antecedent)
+                if key not in joins :
+                    joins[key] = n_vars + len(self.left)
+                    self.left.append(node)
+                    self.right.append(antecedent)
+                node = joins[key]
+            term_inputs.append(node)
+            term_heads.append(kb.heads[rule])
+
+        self.n_joins = len(self.left)
+        n_inputs = n_vars + self.n_joins
+        inputs = self.left + self.right
+        self.succ_offsets, self.succ_joins = build_csr(inputs, array('i', range(self.n_joins)) * 2, n_inputs)
+        self.term_offsets, self.term_heads = build_csr(term_inputs, term_heads, n_inputs)
+
+    def memory_size(self) :
+        """size in bytes of the integer arrays"""
+        size = 0
+        for attribute in ('left', 'right', 'succ_offsets', 'succ_joins', 'term_offsets', 'term_heads') :
+            size += getattr(self, attribute).itemsize * len(getattr(self, attribute))
+        return size
+
+
+class ReteState(QueryState) :
+    """a QueryState with a stamp per join of a network : the epoch at which
+    the first of its two inputs was set True"""
+
+    def __init__(self, kb, network, facts_base=()) :
+        self.join_stamp = array('I', [0]) * network.n_joins
+        QueryState.__init__(self, kb, facts_base)
+
+    def reset(self, facts_base=()) :
+        if self.epoch == MAX_EPOCH :
+            self.join_stamp = array('I', [0]) * len(self.join_stamp)
+        QueryState.reset(self, facts_base)
+
+
+def pre_processing(kb, facts_base, network) :
+    """allocates the state of one query, the kb and the network are left untouched"""
+    return ReteState(kb, network, facts_base)
+
+
+def forward_algorithm(kb, facts_base, question, network=None) :
+    if network is None :
+        network = ReteNetwork(kb)
+    return run(kb, pre_processing(kb, facts_base, network), question, network)
+
+
+def run(kb, state, question, network) :
+    """forward chaining on a ReteState that was just allocated or reset"""
+    epoch = state.epoch
+    values = state.values
+    var_stamp = state.var_stamp
+    join_stamp = state.join_stamp
+    if state.value(question) == TRUE :
+        return True
+
+    n_vars = kb.n_vars
+    succ_offsets = network.succ_offsets
+    succ_joins = network.succ_joins
+    term_offsets = network.term_offsets
+    term_heads = network.term_heads
+
+    # the agenda holds inputs : the facts first, then the variables and joins set True
+    agenda = state.agenda
+    for node in agenda :
+        for consequent in term_heads[term_offsets[node]:term_offsets[node+1]] :
+            if var_stamp[consequent] != epoch :
+                if consequent == question :
+                    return True
+                values[consequent] = TRUE
+                var_stamp[consequent] = epoch
+                agenda.append(consequent)
+
+        for join in succ_joins[succ_offsets[node]:succ_offsets[node+1]] :
+            if join_stamp[join] != epoch :
+                join_stamp[join] = epoch
+            else :
+                agenda.append(n_vars + join)
+
+    return False
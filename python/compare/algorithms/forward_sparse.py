@@ -0,0 +1,73 @@
+#implementation of a vectorized forward chaining algorithm on the sparse rule/antecedent incidence
+
+# entry :
+#  - kb : a CompiledKB (see compiled.py)
+#  - facts_base : a list of variable ids that are True (fact base)
+#  - question : the id of a variable of which we must determine the value
+
+# exit :
+#     - A : a boolean which value is True if question is a LOGICAL CONSEQUENCE of the fact base
+
+# Same counters as forwardV3, but processed by waves (level-synchronous frontiers) :
+# the frontier is the set of variables that became True during the previous wave.
+# One wave gathers every rule of every frontier variable from the CSR index, decrements
+# all their counters at once with np.subtract.at, and the rules whose counter reached 0
+# give the next frontier. The Python loop runs once per wave instead of once per variable.
+# The wave in which a variable becomes True is its derivation depth : the facts have
+# depth 0, and a variable of depth d needs a chain of d rules to be derived.
+# Each wave costs a few numpy calls whatever its size : this pays off on wide bases
+# (benchmark5, benchmark3), on a long chain (benchmark1) with one variable per wave
+# the scalar loop of forward_compiled is faster.
+
+import numpy as np
+
+from vectorized import as_numpy, concatenated_ranges
+
+NOT_DERIVED = -1
+
+
+def distinct(variables, position) :
+    """variables without duplicates, in linear time : position is a scratch array
+    of size n_vars, variables[i] is kept if it is the last occurrence of its value.
+    numpy does not say which write wins when an index is repeated in position[variables] = ...,
+    so the last occurrence is taken with np.maximum.at, after clearing what an earlier call left"""
+    indices = np.arange(variables.size)
+    position[variables] = -1
+    np.maximum.at(position, variables, indices)
+    return variables[position[variables] == indices]
+
+
+def forward_levels(kb, facts_base, question=None) :
+    """returns the depth of every variable (NOT_DERIVED if it is not a logical consequence).
+    If question is given, stops after the wave in which it is derived"""
+
+    body_offsets = as_numpy(kb.body_offsets)
+    heads = as_numpy(kb.heads)
+    ant_offsets = as_numpy(kb.ant_offsets)
+    ant_rules = as_numpy(kb.ant_rules)
+
+    counters = np.diff(body_offsets)
+    depth = np.full(kb.n_vars, NOT_DERIVED, dtype=np.int32)
+    position = np.zeros(kb.n_vars, dtype=np.int64)
+    frontier = distinct(np.asarray(facts_base, dtype=np.int64), position)
+    depth[frontier] = 0
+
+    level = 0
+    while frontier.size :
+        if question is not None and depth[question] != NOT_DERIVED :
+            break
+        level += 1
+
+        rules = ant_rules[concatenated_ranges(ant_offsets[frontier], ant_offsets[frontier + 1])]
+        np.subtract.at(counters, rules, 1)
+
+        # a counter reaches 0 once : when the last of its antecedents is in the frontier
+        consequents = heads[rules[counters[rules] == 0]]
+        frontier = distinct(consequents[depth[consequents] == NOT_DERIVED], position)
+        depth[frontier] = level
+
+    return depth
+
+
+def forward_algorithm(kb, facts_base, question) :
+    return bool(forward_levels(kb, facts_base, question)[question] != NOT_DERIVED)
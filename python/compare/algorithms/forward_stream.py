@@ -0,0 +1,78 @@
+#implementation of the linear forward chaining algorithm (forwardV3) as a generator of the derived variables
+
+# entry :
+#  - kb : a CompiledKB (see compiled.py)
+#  - facts_base : a list of variable ids that are True (fact base)
+#  - with_rules : if True, the rule that fired is given with each variable
+
+# exit :
+#     - D : an iterator over the ids of the variables derived from the fact base (the facts
+#           are not in it), each one given once, as soon as the counter of a rule of which
+#           it is the consequent reaches 0. With with_rules, D gives (variable, rule) pairs
+
+# forward_compiled returns a boolean when the question is found, and materialize
+# (forward_materialized) returns the whole least model : here the propagation yields
+# each variable when it is derived, so the consumer works on it while the propagation
+# goes on, and stops the propagation by leaving the loop (or by D.close()).
+# The variables to read wait on a stack that is emptied as they are read, instead of
+# the agenda of forward_compiled that keeps every derived variable : the memory used
+# is the QueryState, allocated once for the kb, and the variables derived but not read
+# yet. The last derived variable is read first (depth first) : on a tree of rules the
+# stack holds one branch and its siblings, where a queue would hold a whole level.
+# A state left by a stopped iteration must be reset before it is used again.
+
+from compiled import TRUE, QueryState
+
+
+def pre_processing(kb, facts_base) :
+    """allocates the state of one propagation, the kb itself is left untouched"""
+    return QueryState(kb, facts_base)
+
+
+def derivations(kb, facts_base, with_rules=False) :
+    return run(kb, pre_processing(kb, facts_base), with_rules)
+
+
+def forward_algorithm(kb, facts_base, question) :
+    """forward_compiled.forward_algorithm, written on top of the stream"""
+    state = pre_processing(kb, facts_base)
+    if state.value(question) == TRUE :
+        return True
+    for variable in run(kb, state) :
+        if variable == question :
+            return True
+    return False
+
+
+def run(kb, state, with_rules=False) :
+    """generator of the derivations on a QueryState that was just allocated or reset"""
+    epoch = state.epoch
+    counters = state.counters
+    rule_stamp = state.rule_stamp
+    values = state.values
+    var_stamp = state.var_stamp
+
+    ant_offsets = kb.ant_offsets
+    ant_rules = kb.ant_rules
+    heads = kb.heads
+    body_len = kb.body_len
+
+    pending = list(state.agenda)
+    while pending :
+        variable = pending.pop()
+        for rule in ant_rules[ant_offsets[variable]:ant_offsets[variable+1]] :
+            if rule_stamp[rule] != epoch :
+                rule_stamp[rule] = epoch
+                counters[rule] = body_len[rule] - 1
+            else :
+                counters[rule] -= 1
+            if counters[rule] == 0 :
+                consequent = heads[rule]
+                if var_stamp[consequent] != epoch :
+                    values[consequent] = TRUE
+                    var_stamp[consequent] = epoch
+                    pending.append(consequent)
+                    if with_rules :
+                        yield consequent, rule
+                    else :
+                        yield consequent
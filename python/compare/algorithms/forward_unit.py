@@ -0,0 +1,103 @@
+#implementation of a forward chaining algorithm with a fast path for the rules with a single antecedent
+
+# entry :
+#  - kb : a CompiledKB (see compiled.py)
+#  - facts_base : a list of variable ids that are True (fact base)
+#  - question : the id of a variable of which we must determine the value
+
+# exit :
+#     - A : a boolean which value is True if question is a LOGICAL CONSEQUENCE of the fact base
+
+# A rule a => c with a single antecedent (unit rule) needs no counter : it fires as soon
+# as a is True. The unit rules are an implication graph, kept in CSR form by a UnitGraph :
+# the consequents of the unit rules of a are targets[offsets[a]:offsets[a+1]]. The forward
+# chaining is then a breadth first search of this graph from the facts, the agenda is
+# the queue. Only the rules with two antecedents or more keep a counter, they are in a
+# second CSR index (multi_offsets, multi_rules) and are decremented as in forward_compiled.
+# On a base made of unit rules only (benchmark1, 3, 5) no counter is ever touched.
+
+from array import array
+
+from compiled import TRUE, QueryState, build_csr
+
+
+class UnitGraph :
+    """the rules of a kb split in two, built once per kb :
+    - offsets, targets : consequents of the unit rules of each variable
+    - multi_offsets, multi_rules : rules with two antecedents or more of each variable
+    - n_unit : number of unit rules"""
+
+    def __init__(self, kb) :
+        sources = array('i')
+        targets = array('i')
+        multi_sources = array('i')
+        multi_rules = array('i')
+        for rule in range(kb.n_rules) :
+            antecedents = kb.antecedents(rule)
+            if len(antecedents) == 1 :
+                sources.append(antecedents[0])
+                targets.append(kb.heads[rule])
+            else :
+                for antecedent in antecedents :
+                    multi_sources.append(antecedent)
+                    multi_rules.append(rule)
+
+        self.n_unit = len(sources)
+        self.offsets, self.targets = build_csr(sources, targets, kb.n_vars)
+        self.multi_offsets, self.multi_rules = build_csr(multi_sources, multi_rules, kb.n_vars)
+
+
+def pre_processing(kb, facts_base) :
+    """allocates the state of one query, the kb itself is left untouched"""
+    return QueryState(kb, facts_base)
+
+
+def forward_algorithm(kb, facts_base, question, units=None) :
+    if units is None :
+        units = UnitGraph(kb)
+    return run(kb, pre_processing(kb, facts_base), question, units)
+
+
+def run(kb, state, question, units) :
+    """forward chaining on a QueryState that was just allocated or reset"""
+    epoch = state.epoch
+    counters = state.counters
+    rule_stamp = state.rule_stamp
+    values = state.values
+    var_stamp = state.var_stamp
+    agenda = state.agenda
+    if state.value(question) == TRUE :
+        return True
+
+    offsets = units.offsets
+    targets = units.targets
+    multi_offsets = units.multi_offsets
+    multi_rules = units.multi_rules
+    heads = kb.heads
+    body_len = kb.body_len
+
+    for variable in agenda :
+        for consequent in targets[offsets[variable]:offsets[variable+1]] :
+            if var_stamp[consequent] != epoch :
+                if consequent == question :
+                    return True
+                values[consequent] = TRUE
+                var_stamp[consequent] = epoch
+                agenda.append(consequent)
+
+        for rule in multi_rules[multi_offsets[variable]:multi_offsets[variable+1]] :
+            if rule_stamp[rule] != epoch :
+                rule_stamp[rule] = epoch
+                counters[rule] = body_len[rule] - 1
+            else :
+                counters[rule] -= 1
+            if counters[rule] == 0 :
+                consequent = heads[rule]
+                if consequent == question :
+                    return True
+                if var_stamp[consequent] != epoch :
+                    values[consequent] = TRUE
+                    var_stamp[consequent] = epoch
+                    agenda.append(consequent)
+
+    return False
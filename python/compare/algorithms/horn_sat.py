@@ -0,0 +1,46 @@
+#implementation of the linear Horn satisfiability algorithm (Dowling-Gallier) on a compiled knowledge base
+
+# entry :
+#  - kb : a CompiledKB (see compiled.py) of definite rules A ∧ B => C and of goal
+#         clauses A ∧ B => ⊥ (a rule whose consequent is classes.faux)
+#  - facts_base : a list of variable ids that are True (fact base)
+
+# exit :
+#     - S : a boolean which value is True if the rules, the goal clauses and the facts are satisfiable
+#     - M : if S is True, the minimal model : the ids of the True variables, the facts first,
+#           then the others in the order they are derived. If S is False, the goal clause
+#           whose antecedents are all True (None if ⊥ is a fact)
+
+# A set of Horn clauses is satisfiable if and only if its least model, the closure of the
+# facts by the definite rules, makes no goal clause True : the minimal model is then
+# this closure, every variable outside of it being False. The closure is computed by
+# forward_compiled.closure, with the counters of forwardV3.pre_processing kept in a
+# compiled.QueryState, and ⊥ is handled as an ordinary variable : the first goal
+# clause whose counter reaches 0 stops the propagation. Each clause is read once per
+# antecedent, the time is linear in the size of the base.
+
+from classes import faux
+from compiled import TRUE, QueryState
+from algorithms.forward_compiled import closure
+
+
+def pre_processing(kb, facts_base) :
+    """allocates the state of one query, the kb itself is left untouched"""
+    return QueryState(kb, facts_base)
+
+
+def solve(kb, facts_base) :
+    return run(kb, pre_processing(kb, facts_base))
+
+
+def run(kb, state) :
+    """returns (S, M), see above, on a QueryState that was just allocated or reset"""
+    falsum = kb.index.get(faux, -1)
+    if falsum != -1 and state.value(falsum) == TRUE :
+        return False, None
+
+    # ⊥ is never set True : the first goal clause that fires ends the propagation
+    rule = closure(kb, state, falsum)
+    if rule is not None :
+        return False, rule
+    return True, list(state.agenda)
@@ -0,0 +1,69 @@
+import generateData
+import toPrint
+import toJSON
+import string
+
+
+#number of sets that will be created, each one is stored in a different file
+numberOfSets = 1
+
+#number of elements in a single set
+numberOfElements = 10
+
+#the maximum number of rules an element could contain
+maxNumberOfRules = 7
+
+#the maximum number of antecedents a rule could contain
+maxNumberOfAntecedents = 5
+
+#the maximum number of variable a facts base could contain
+#   if the number is greater than the length of the variable base, then it is set to its length
+FactsBaseMaxLength = 25
+
+#the maximum number of variables the database used to create rules could contain
+DataBaseMaxLength = 30
+
+
+
+#the letters that will be used to create the variables within the rules
+strings = string.ascii_uppercase[13:] #from M to Z
+#str = string.ascii_uppercase #from A to Z
+
+#the numbers that will be used to create the variables within the rules
+integ = string.digits #from 0 to 9
+variableBase = generateData.generateListOfVariables(strings,integ, length=10)
+
+#the directory where the files will be stored
+dirName = "data/benchmark6/"
+
+
+# k rules P0 ∧ ... ∧ P(h-1) ∧ Ph.g ∧ ... ∧ P(n-1).g ∧ Q.j => Q.(j+1) with g = j % 4
+# and h = n // 2 : all the rules share their h first antecedents, the rules of a
+# group share their n first antecedents
+
+# k :
+# number of rules of the benchmark
+
+# n :
+# number of antecedents shared by the rules of a group
+
+def create_benchmark(k, n, stored=dirName, show=False) :
+
+    for i in range (numberOfSets) :
+        set = generateData.generateBenchmark(k, n, benchmark=6, variableBase=[])
+        name = stored +"bench" + str(i)
+        toJSON.store(set,name)
+        if show :
+            print()
+            print()
+            print ("----------------------- " + name + " -----------------------" )
+            print()
+            toPrint.generationToPrint(set,benchmark=6,k=k, n=n )
+
+
+def create_benchmark2( k, n,show) :
+
+    set = generateData.generateBenchmark(k, n, benchmark=6, variableBase=[])
+    if show :
+            toPrint.generationToPrint(set, benchmark = 6,k=k, n=n)
+    return set
@@ -1,8 +1,12 @@
+import gc
+from array import array
+
 
 
 ou = "∨"
 et = "∧"
 implique = "=>"
+faux = "⊥"           # consequent of a goal clause : A ∧ B => ⊥
 expr = "expression"
 
 class Question :
@@ -167,6 +171,219 @@ class Variable :
 
 
 
+# compact variants of the classes above : same attributes and methods, but stored in
+# __slots__ instead of a per-instance __dict__. Their rules and successors lists are
+# only allocated when the first element is added, until then they share the empty
+# tuple NONE. They are selected with the layout parameter of the loaders.
+
+NONE = ()
+
+class CompactQuestion :
+   """a Question without __dict__"""
+   __slots__ = ('expressions', 'connector')
+
+   __init__ = Question.__init__
+   __str__ = Question.__str__
+   evaluate = Question.evaluate
+
+class CompactExpression :
+   """an Expression without __dict__"""
+   __slots__ = ('vars', 'connector')
+
+   __init__ = Expression.__init__
+   __str__ = Expression.__str__
+   evaluate = Expression.evaluate
+
+class CompactRule :
+    """a Rule without __dict__"""
+    __slots__ = ('antecedents', 'connector', 'consequent', 'counter', 'successors')
+
+    def __init__(self, antecedents, consequent, counter = 0):
+        self.antecedents = antecedents
+        self.connector = implique
+        self.consequent = consequent
+        self.counter = counter
+        self.successors = NONE
+
+    def reset (self):
+       self.counter = 0
+       self.successors = NONE
+
+    __str__ = Rule.__str__
+
+    def addSuccessor(self, successor) :
+       if self.successors is NONE :
+          self.successors = []
+       self.successors.append(successor)
+
+class CompactVariable :
+    """a Variable without __dict__"""
+    __slots__ = ('name', 'value', 'rules', 'used', 'known', 'successors', 'order')
+
+    def __init__ (self, name, value=None) :
+      self.name = name
+      self.value = value
+      self.rules = NONE
+      self.used = False
+      self.known = False
+      self.successors = NONE
+      self.order = None
+
+    def reset(self) :
+        self.rules = NONE
+        self.reset_ant()
+
+    def reset_ant(self) :
+        self.value = None
+        self.used = False
+        self.known = False
+        self.successors = NONE
+        self.order = None
+
+    def addRule(self, rule) :
+       if self.rules is NONE :
+          self.rules = []
+       self.rules.append(rule)
+
+    def addSuccessor(self, successor) :
+       if self.successors is NONE :
+          self.successors = []
+       self.successors.append(successor)
+
+    __eq__ = Variable.__eq__
+    __str__ = Variable.__str__
+    assign = Variable.assign
+    isTrue = Variable.isTrue
+    isTrue3 = Variable.isTrue3
+    evaluate = Variable.evaluate
+    use = Variable.use
+    isUsed = Variable.isUsed
+    know = Variable.know
+    isKnown = Variable.isKnown
+
+
+# encoding of a variable value in VariableColumns.value : None, False, True or "ON"
+# (the ON state of backward algorithms)
+VALUE_CODES = {None : -1, False : 0, True : 1, "ON" : 2}
+CODE_VALUES = (False, True, "ON", None)      # CODE_VALUES[-1] is None
+
+class VariableColumns :
+   """the per-variable flags of a whole set, stored in shared arrays instead of in
+   each variable : variable i has value[i], used[i], known[i] and order[i] (-1 for None)"""
+
+   def __init__ (self) :
+      self.value = array('b')
+      self.used = array('b')
+      self.known = array('b')
+      self.order = array('i')
+
+   def add (self) :
+      """allocates the flags of a new variable and returns its index"""
+      self.value.append(-1)
+      self.used.append(0)
+      self.known.append(0)
+      self.order.append(-1)
+      return len(self.value) - 1
+
+   def memory_size (self) :
+      return sum(column.itemsize * len(column) for column in (self.value, self.used, self.known, self.order))
+
+class ColumnVariable :
+    """a Variable whose value, used, known and order flags live in a VariableColumns
+    shared by all the variables of a set, the object only keeps its index"""
+    __slots__ = ('name', 'rules', 'successors', 'columns', 'index')
+
+    def __init__ (self, name, columns, value=None) :
+        self.name = name
+        self.rules = NONE
+        self.successors = NONE
+        self.columns = columns
+        self.index = columns.add()
+        self.value = value
+
+    @property
+    def value (self) :
+        return CODE_VALUES[self.columns.value[self.index]]
+
+    @value.setter
+    def value (self, value) :
+        self.columns.value[self.index] = VALUE_CODES[value]
+
+    @property
+    def used (self) :
+        return self.columns.used[self.index] == 1
+
+    @used.setter
+    def used (self, used) :
+        self.columns.used[self.index] = used
+
+    @property
+    def known (self) :
+        return self.columns.known[self.index] == 1
+
+    @known.setter
+    def known (self, known) :
+        self.columns.known[self.index] = known
+
+    @property
+    def order (self) :
+        order = self.columns.order[self.index]
+        return None if order == -1 else order
+
+    @order.setter
+    def order (self, order) :
+        self.columns.order[self.index] = -1 if order is None else order
+
+    reset = CompactVariable.reset
+    reset_ant = CompactVariable.reset_ant
+    addRule = CompactVariable.addRule
+    addSuccessor = CompactVariable.addSuccessor
+    __eq__ = Variable.__eq__
+    __str__ = Variable.__str__
+    assign = Variable.assign
+    isTrue = Variable.isTrue
+    isTrue3 = Variable.isTrue3
+    evaluate = Variable.evaluate
+    use = Variable.use
+    isUsed = Variable.isUsed
+    know = Variable.know
+    isKnown = Variable.isKnown
+
+
+class Layout :
+   """the classes the loaders build a set with :
+   'objects' : Variable, Rule, Expression, Question (default)
+   'slots'   : CompactVariable, CompactRule, CompactExpression, CompactQuestion
+   'columns' : ColumnVariable sharing one VariableColumns, and the compact classes"""
+
+   def __init__ (self, name='objects') :
+      self.name = name
+      if name == 'objects' :
+         self.Rule, self.Expression, self.Question = Rule, Expression, Question
+      elif name == 'slots' or name == 'columns' :
+         self.Rule, self.Expression, self.Question = CompactRule, CompactExpression, CompactQuestion
+      else :
+         raise ValueError(f"Unknown layout: {name}")
+      self.columns = VariableColumns() if name == 'columns' else None
+
+   def Variable (self, name) :
+      if self.name == 'objects' :
+         return Variable(name)
+      if self.name == 'slots' :
+         return CompactVariable(name)
+      return ColumnVariable(name, self.columns)
+
+def getLayout (layout) :
+   """takes a layout name or a Layout and returns a Layout.
+   A 'columns' layout must not be shared between two sets, hence a new one for each name"""
+   if isinstance(layout, Layout) :
+      return layout
+   return Layout(layout)
+
+OBJECTS = Layout('objects')
+
+
+
 # parsing the dictionnary from the JSON to an adapted format
 # JSON dictionnary : 
 # {'rules': [['Var1 ∧ ... ∧ VarN ', 'Consequence'], ... ], 
@@ -185,43 +402,52 @@ class Variable :
 
 
 
-def createSet (JSONobject) :
-   """create an entire set based on json data"""
+def createSet (JSONobject, layout='objects', normalise=False, pauseGC=False) :
+   """create an entire set based on json data
+   layout selects the classes of the objects : 'objects', 'slots' or 'columns' (cf Layout)
+   if normalise is True, the rules go through normaliseRules first (with pauseGC) and its
+   report is stored under the key 'normalisation'"""
+   layout = getLayout(layout)
    variables = {}
    dictionnaire = {}          # FB, R, Q
    rules = JSONobject['rules']
    fb = JSONobject['facts base']
    question = JSONobject['question']
+   if normalise :
+      rules, dictionnaire['normalisation'] = normaliseRules(rules, pauseGC)
    
    rulesParsed = []
    for rule in rules :
-      rulesParsed.append(listToRule(rule, variables))
+      rulesParsed.append(listToRule(rule, variables, layout))
    dictionnaire['rules'] = rulesParsed
-   dictionnaire['facts base'] = createFBObj(fb, variables)
-   dictionnaire['question'] = createQObj(parseQuestion(question), variables)
+   dictionnaire['facts base'] = createFBObj(fb, variables, layout)
+   dictionnaire['question'] = createQObj(parseQuestion(question), variables, layout)
    return dictionnaire
 
-def createSet2 (set) :
+def createSet2 (set, layout='objects', normalise=False, pauseGC=False) :
    bench = set[0]
 
    """create an entire set based on json data"""
+   layout = getLayout(layout)
    variables = {}
    dictionnaire = {}          # FB, R, Q
    rules = bench['rules']
    fb = bench['facts base']
    question = bench['question']
+   if normalise :
+      rules, dictionnaire['normalisation'] = normaliseRules(rules, pauseGC)
    
    rulesParsed = []
    for rule in rules :
-      rulesParsed.append(listToRule(rule, variables))
+      rulesParsed.append(listToRule(rule, variables, layout))
    dictionnaire['rules'] = rulesParsed
-   dictionnaire['facts base'] = createFBObj(fb, variables)
-   dictionnaire['question'] = createQObj(parseQuestion(question), variables)
+   dictionnaire['facts base'] = createFBObj(fb, variables, layout)
+   dictionnaire['question'] = createQObj(parseQuestion(question), variables, layout)
    
    return dictionnaire
 
 
-def createAntObj (list, variables) :
+def createAntObj (list, variables, layout=OBJECTS) :
    """takes a list of antecedents in the format ['Var1', ..., 'VarN']
    and returns a list of Variable objects [Variable1, ..., VariableN]
    board effects : it stores these variables in the dictionary variables"""
@@ -229,31 +455,31 @@ def createAntObj (list, variables) :
    antList = []
    for antStr in list :
       if antStr not in variables :
-         ant = Variable(antStr)
+         ant = layout.Variable(antStr)
          variables[antStr] = ant
       else :
          ant = variables[antStr]
       antList.append(ant)
    return antList
 
-def createCsqObj (var, variables) :
+def createCsqObj (var, variables, layout=OBJECTS) :
    """takes a string in the format 'Var'
    and return a Variable object Variable"""
 
    if var not in variables :
-      csq = Variable(var)
+      csq = layout.Variable(var)
       variables[var] = csq
    else :
       csq = variables[var]
    return csq
 
-def createQObj (question_dic, variables) :
+def createQObj (question_dic, variables, layout=OBJECTS) :
    """takes a question in dictionnary format and return a question object """
   
    if ('connectors' not in question_dic) :
       # the question is just a variable
       if (question_dic['expression'] not in variables) :
-         question = Variable(question_dic['expression'])
+         question = layout.Variable(question_dic['expression'])
          variables[question_dic['expression']]=question
       else :
          question = variables[question_dic['expression']]
@@ -267,32 +493,32 @@ def createQObj (question_dic, variables) :
          # the question in a disjunction of conjunctions
          for expression in expressions :
             # expr.append(Expression(listToVars(parseAND(expression),variables),et))
-            expr.append(Expression(listToVars(parseConnector(expression,et),variables),et))
+            expr.append(layout.Expression(listToVars(parseConnector(expression,et),variables,layout),et))
 
       elif connector == et : 
          # the question is a conjunction of disjunctions
          for expression in expressions :
-            expr.append(Expression(listToVars(parseConnector(expression,ou), variables),ou))
+            expr.append(layout.Expression(listToVars(parseConnector(expression,ou), variables, layout),ou))
 
       elif connector == None :
          # the question is a disjunction or a conjunction of simple variables
          expression = expressions[0]
          if ou in expression :
-            expr.append(Expression(listToVars(parseConnector(expression,ou), variables),ou))
+            expr.append(layout.Expression(listToVars(parseConnector(expression,ou), variables, layout),ou))
          elif et in expression :
-            expr.append(Expression(listToVars(parseConnector(expression,et), variables),et))
+            expr.append(layout.Expression(listToVars(parseConnector(expression,et), variables, layout),et))
 
-      question = Question(expr, connector)
+      question = layout.Question(expr, connector)
       return question
 
-def createFBObj (list, variables) :
+def createFBObj (list, variables, layout=OBJECTS) :
    """takes a list of antecedents in the format ['Var1', ..., 'VarN']
    and returns a list of Variable objects [Variable1, ..., VariableN]"""
    
    fbList = []
    for varStr in list :
       if varStr not in variables :
-         var = Variable(varStr)
+         var = layout.Variable(varStr)
          variables[varStr]=(var)
       else :
          var = variables[varStr]
@@ -371,23 +597,91 @@ def parseRule (rule, dict={}) :
    return dict
 
 #Brice : verified
-def listToRule(listRule, variables) :
+def listToRule(listRule, variables, layout=OBJECTS) :
    """takes a rule in the format ['Var1 ∧ ... ∧ VarN ', 'Consequence']
    and returns a Rule object"""
 
    parsedRule = parseRule(listRule) # dico
-   ants = createAntObj(parsedRule['antecedents'], variables)
-   csq = createCsqObj(parsedRule['consequent'], variables)
-
-   return Rule(ants, csq)
-
-def listToVars(list, variables) :
+   ants = createAntObj(parsedRule['antecedents'], variables, layout)
+   csq = createCsqObj(parsedRule['consequent'], variables, layout)
+
+   return layout.Rule(ants, csq)
+
+def normaliseRules(rules, pauseGC=False) :
+   """takes rules in the format [['Var1 ∧ ... ∧ VarN ', 'Consequence'], ... ] and returns
+   (normalised rules, report) where, in the normalised rules (same format, same order) :
+   - an antecedent appears once in a rule (a repeated one is counted twice by rule.counter
+     in forwardV3.pre_processing but decrements it once, the rule could never fire)
+   - a rule appears once, whatever the order of its antecedents
+   - no rule is subsumed : a rule whose antecedents contain all the antecedents of an
+     other rule with the same consequent is removed, it can never derive anything new
+   report = {'rules', 'duplicate antecedents', 'identical rules', 'subsumed rules', 'kept'}
+
+   Millions of small tuples and sets are created and none of them is garbage : the
+   cyclic garbage collector goes through all of them again and again, about half of
+   the time on benchmark3 with k=1000 (13 s instead of 5 s). With pauseGC=True the
+   collector is disabled until the rules are normalised. It is disabled for the whole
+   process, so a caller that runs other threads at the same time should leave it False"""
+
+   if not pauseGC :
+      return _normaliseRules(rules)
+   enabled = gc.isenabled()
+   gc.disable()
+   try :
+      return _normaliseRules(rules)
+   finally :
+      if enabled :
+         gc.enable()
+
+def _normaliseRules(rules) :
+   report = {'rules' : len(rules), 'duplicate antecedents' : 0, 'identical rules' : 0,
+             'subsumed rules' : 0, 'kept' : 0}
+
+   parsed = []     # (position, antecedents, body, consequent)
+   seen = set()
+   for position, rule in enumerate(rules) :
+      parsedAntecedents = parseConnector(rule[0], et)
+      antecedents = list(dict.fromkeys(parsedAntecedents))
+      report['duplicate antecedents'] += len(parsedAntecedents) - len(antecedents)
+      body = frozenset(antecedents)
+      if (body, rule[1]) in seen :
+         report['identical rules'] += 1
+         continue
+      seen.add((body, rule[1]))
+      parsed.append((position, antecedents, body, rule[1]))
+
+   # for each consequent, the bodies are kept from the smallest one : a body is subsumed
+   # if a kept body is included in it, the kept bodies that could be are found
+   # through the antecedents they contain
+   kept = []
+   containing = {}      # (consequent, antecedent) : [kept bodies]
+   for position, antecedents, body, consequent in sorted(parsed, key=lambda p : len(p[2])) :
+      subsumed = False
+      for antecedent in body :
+         for other in containing.get((consequent, antecedent), ()) :
+            if other <= body :
+               subsumed = True
+               break
+         if subsumed :
+            break
+      if subsumed :
+         report['subsumed rules'] += 1
+         continue
+      for antecedent in body :
+         containing.setdefault((consequent, antecedent), []).append(body)
+      kept.append((position, antecedents, consequent))
+
+   kept.sort()
+   report['kept'] = len(kept)
+   return [[(" " + et + " ").join(antecedents), consequent] for _, antecedents, consequent in kept], report
+
+def listToVars(list, variables, layout=OBJECTS) :
    """ convert a list of string into a list of variable objects"""
    
    vars = []
    for varStr in list :
       if varStr not in variables :
-         var = Variable(varStr)
+         var = layout.Variable(varStr)
          variables[varStr] = var
       else : 
          var = variables[varStr]
@@ -0,0 +1,250 @@
+'''
+Description : compilation of a rule base (as built by classes.createSet)
+into a compact integer-indexed knowledge base.
+
+Variables are interned to dense integers 0 .. n_vars-1 and rules to
+0 .. n_rules-1. Every adjacency list of the object model is stored in CSR
+form : an offsets array and an index array, the items of row i being
+index[offsets[i]:offsets[i+1]].
+
+ - body_offsets / body_vars : the antecedents of each rule (Rule.antecedents)
+ - ant_offsets / ant_rules  : the rules a variable is an antecedent of
+                              (Variable.rules as built by forwardV3.pre_processing)
+ - csq_offsets / csq_rules  : the rules a variable is the consequent of
+                              (Variable.rules as built by backwardV5.pre_processing)
+ - heads                    : the consequent of each rule
+
+    example :
+rules = [A ∧ B => C, C => D]
+names        = ['A', 'B', 'C', 'D']
+body_offsets = [0, 2, 3]           body_vars = [0, 1, 2]       heads = [2, 3]
+ant_offsets  = [0, 1, 2, 3, 3]     ant_rules = [0, 0, 1]
+csq_offsets  = [0, 0, 0, 1, 2]     csq_rules = [0, 1]
+'''
+
+from array import array
+
+# values of a variable in the per-query value arrays (bytearray)
+UNKNOWN = 0
+TRUE = 1
+FALSE = 2
+ON = 3
+
+
+# integer arrays of a CompiledKB
+ARRAYS = ('body_offsets', 'body_vars', 'heads', 'body_len',
+          'ant_offsets', 'ant_rules', 'csq_offsets', 'csq_rules')
+
+
+class CompiledKB :
+    """a rule base compiled to integer arrays, see the description above.
+    Built by compile_rules / compile_set, engines are in algorithms.forward_compiled
+    and algorithms.backward_compiled"""
+
+    def __init__(self, names, body_offsets, body_vars, heads) :
+        self.names = names
+        self.index = {name : i for i, name in enumerate(names)}
+        self.n_vars = len(names)
+        self.n_rules = len(heads)
+
+        self.body_offsets = body_offsets
+        self.body_vars = body_vars
+        self.heads = heads
+        # initial value of the rule counters of the forward algorithm
+        self.body_len = array('i', [body_offsets[r+1] - body_offsets[r] for r in range(self.n_rules)])
+
+        rule_of_entry = array('i', [0]) * len(body_vars)
+        for r in range(self.n_rules) :
+            for i in range(body_offsets[r], body_offsets[r+1]) :
+                rule_of_entry[i] = r
+
+        self.ant_offsets, self.ant_rules = build_csr(body_vars, rule_of_entry, self.n_vars)
+        self.csq_offsets, self.csq_rules = build_csr(heads, array('i', range(self.n_rules)), self.n_vars)
+
+        self.freeze()
+
+    def freeze(self) :
+        """replaces the arrays by read-only views : the index is built once and shared
+        by every query, all the mutable data of a query lives in a QueryState"""
+        for attribute in ARRAYS :
+            view = memoryview(getattr(self, attribute))
+            object.__setattr__(self, attribute, view.toreadonly())
+        object.__setattr__(self, 'frozen', True)
+
+    def __setattr__(self, attribute, value) :
+        if getattr(self, 'frozen', False) :
+            raise AttributeError("a CompiledKB is read-only, per query data goes in a QueryState")
+        object.__setattr__(self, attribute, value)
+
+    def new_state(self, facts_base) :
+        """allocates the state of one query, see QueryState"""
+        return QueryState(self, facts_base)
+
+    def id_of(self, variable) :
+        """returns the integer of a variable, given as a Variable object or as its name"""
+        if isinstance(variable, str) :
+            return self.index[variable]
+        return self.index[variable.name]
+
+    def ids_of(self, variables) :
+        return [self.id_of(variable) for variable in variables]
+
+    def antecedents(self, rule) :
+        return self.body_vars[self.body_offsets[rule]:self.body_offsets[rule+1]]
+
+    def rules_of(self, variable) :
+        """rules in which the variable is an antecedent"""
+        return self.ant_rules[self.ant_offsets[variable]:self.ant_offsets[variable+1]]
+
+    def rules_for(self, variable) :
+        """rules of which the variable is the consequent"""
+        return self.csq_rules[self.csq_offsets[variable]:self.csq_offsets[variable+1]]
+
+    def rule_str(self, rule) :
+        antecedents = " ∧ ".join(self.names[v] for v in self.antecedents(rule))
+        return antecedents + " => " + self.names[self.heads[rule]]
+
+    def memory_size(self) :
+        """size in bytes of the integer arrays (names and index excluded)"""
+        size = 0
+        for attribute in ARRAYS :
+            size += getattr(self, attribute).nbytes
+        return size
+
+    def __str__(self) :
+        return "\n".join(self.rule_str(r) for r in range(self.n_rules))
+
+
+# stamps are unsigned 32 bits integers
+MAX_EPOCH = 2**32 - 1
+
+
+class QueryState :
+    """mutable data of a query on a CompiledKB, so that the kb itself never has to be
+    reset nor pre-processed again :
+    - values : value of each variable (UNKNOWN, TRUE, FALSE or ON), facts are TRUE
+    - counters : one counter per rule, starting at the number of antecedents
+    - agenda : the facts, without duplicates, in the order they were given
+
+    A state can be reused for many queries : each variable and each rule carries the
+    epoch (var_stamp, rule_stamp) at which its value or counter was last written.
+    reset() only increments the epoch, so every stale value reads as UNKNOWN and every
+    stale counter is reloaded from kb.body_len the first time the new query touches it.
+    Starting a query costs O(facts) instead of a sweep of the whole kb.
+    This only holds for the engines of a CompiledKB : forwardV3, backwardV5 and backwardV7
+    keep their values and counters in the Variable and Rule objects, which reset_state
+    (time_measuring, test) still sweeps before each of their queries"""
+
+    def __init__(self, kb, facts_base=()) :
+        self.values = bytearray(kb.n_vars)
+        self.var_stamp = array('I', [0]) * kb.n_vars
+        self.counters = array('i', [0]) * kb.n_rules
+        self.rule_stamp = array('I', [0]) * kb.n_rules
+        self.epoch = 0
+        self.reset(facts_base)
+
+    def reset(self, facts_base=()) :
+        """starts a new query, the previous one is invalidated lazily"""
+        self.epoch += 1
+        if self.epoch > MAX_EPOCH :
+            # once every 2**32 queries the stamps are really cleared
+            self.var_stamp = array('I', [0]) * len(self.var_stamp)
+            self.rule_stamp = array('I', [0]) * len(self.rule_stamp)
+            self.epoch = 1
+
+        self.agenda = []
+        for variable in facts_base :
+            if self.value(variable) != TRUE :
+                self.assign(variable, TRUE)
+                self.agenda.append(variable)
+
+    def value(self, variable) :
+        if self.var_stamp[variable] != self.epoch :
+            return UNKNOWN
+        return self.values[variable]
+
+    def assign(self, variable, value) :
+        self.values[variable] = value
+        self.var_stamp[variable] = self.epoch
+
+
+def build_csr(rows, values, n_rows) :
+    """takes two parallel arrays (rows[i], values[i]) and returns (offsets, index)
+    such that index[offsets[r]:offsets[r+1]] are the values of row r, in their original order"""
+
+    offsets = array('i', [0]) * (n_rows + 1)
+    for r in rows :
+        offsets[r+1] += 1
+    for r in range(n_rows) :
+        offsets[r+1] += offsets[r]
+
+    index = array('i', [0]) * len(values)
+    position = array('i', offsets)
+    for r, value in zip(rows, values) :
+        index[position[r]] = value
+        position[r] += 1
+    return offsets, index
+
+
+def compile_rules(rules, variables=()) :
+    """takes a list of Rule objects and returns a CompiledKB.
+    variables are extra Variable objects (facts, question) that must be interned
+    even if they appear in no rule.
+    Repeated antecedents in a rule are kept once, otherwise the rule counter
+    could never reach 0"""
+
+    names = []
+    index = {}
+
+    def intern(name) :
+        if name not in index :
+            index[name] = len(names)
+            names.append(name)
+        return index[name]
+
+    body_offsets = array('i', [0])
+    body_vars = array('i')
+    heads = array('i')
+    for rule in rules :
+        seen = set()
+        for antecedent in rule.antecedents :
+            v = intern(antecedent.name)
+            if v not in seen :
+                seen.add(v)
+                body_vars.append(v)
+        body_offsets.append(len(body_vars))
+        heads.append(intern(rule.consequent.name))
+
+    for variable in variables :
+        intern(variable.name)
+
+    return CompiledKB(names, body_offsets, body_vars, heads)
+
+
+def question_variables(question) :
+    """returns the Variable objects a question is made of"""
+    if question is None :
+        return []
+    if hasattr(question, 'name') :
+        return [question]
+    variables = []
+    for expression in question.expressions :
+        variables.extend(expression.vars)
+    return variables
+
+
+def compile_set(rules, facts_base, question) :
+    """takes the output of load_data.load_benchmark2 (or the fields of classes.createSet)
+    and returns (kb, facts_base, question) where facts are integers, and so is
+    the question when it is a single variable
+
+    example :
+        >>> R, FB, Q = load_data.load_benchmark2(data)
+        >>> kb, facts, q = compile_set(R, FB, Q)
+    """
+
+    kb = compile_rules(rules, list(facts_base) + question_variables(question))
+    facts = kb.ids_of(facts_base)
+    if hasattr(question, 'name') :
+        question = kb.id_of(question)
+    return kb, facts, question
@@ -0,0 +1,160 @@
+'''
+Description : contraction of the chains of unit rules of a CompiledKB.
+
+A variable x is inside a chain when it is the consequent of a single rule, a => x,
+and the antecedent of a single rule, x => c, both with one antecedent : x is True
+exactly when a is, and it is only used to make c True. A maximal chain
+v0 => x1 => ... => x(L-1) => vL is replaced by one rule v0 => vL of length L, and
+x1 ... x(L-1) are removed from the kb. The contracted kb is an ordinary CompiledKB,
+every compiled engine (forward_compiled, backward_compiled, backward_scc, ...)
+runs on it, and its size depends on the branching points of the base, not on the
+length of its chains : benchmark1 (k chains of length n) becomes k rules.
+
+The removed variables are remembered : a fact inside a chain makes the end of the
+chain True, a question inside a chain is True if the start of the chain is True or
+a fact is before it in the chain, and expand(rule) gives the whole chain of a
+contracted rule back, for an explanation.
+'''
+
+from array import array
+
+from compiled import CompiledKB, build_csr
+
+
+class ContractedKB :
+    """a CompiledKB whose chains of unit rules are contracted :
+    - original : the CompiledKB it comes from
+    - kb : the contracted CompiledKB
+    - new_id : id in kb of each variable of original, -1 if it is inside a chain
+    - lengths : number of rules of original each rule of kb stands for
+    - chain_offsets, chain_vars : the variables of original inside rule r of kb are
+      chain_vars[chain_offsets[r]:chain_offsets[r+1]], in the order of the chain
+    - chain_rule, chain_pos : for a variable inside a chain, its rule in kb and
+      its position in the chain (1 for the first one)"""
+
+    def __init__(self, original, kb, new_id, lengths, chain_offsets, chain_vars) :
+        self.original = original
+        self.kb = kb
+        self.new_id = new_id
+        self.lengths = lengths
+        self.chain_offsets = chain_offsets
+        self.chain_vars = chain_vars
+        self.chain_rule = array('i', [-1]) * original.n_vars
+        self.chain_pos = array('i', [0]) * original.n_vars
+        for rule in range(kb.n_rules) :
+            for position, v in enumerate(self.chain(rule), 1) :
+                self.chain_rule[v] = rule
+                self.chain_pos[v] = position
+
+    def chain(self, rule) :
+        """variables of original inside a rule of kb"""
+        return self.chain_vars[self.chain_offsets[rule]:self.chain_offsets[rule+1]]
+
+    def expand(self, rule) :
+        """the rules of original a rule of kb stands for, as a list of
+        (antecedents, consequent) of variables of original"""
+        kb = self.kb
+        antecedents = [self.original.index[kb.names[v]] for v in kb.antecedents(rule)]
+        path = list(self.chain(rule)) + [self.original.index[kb.names[kb.heads[rule]]]]
+        rules = [(antecedents, path[0])]
+        for a, c in zip(path, path[1:]) :
+            rules.append(([a], c))
+        return rules
+
+    def facts(self, facts_base) :
+        """the facts (ids of original) as ids of kb, a fact inside a chain gives
+        the end of its chain"""
+        facts = []
+        for v in facts_base :
+            if self.new_id[v] != -1 :
+                facts.append(self.new_id[v])
+            else :
+                facts.append(self.kb.heads[self.chain_rule[v]])
+        return facts
+
+    def ask(self, algorithm, facts_base, question) :
+        """answers a question on original with algorithm(kb, facts_base, question),
+        an engine of a CompiledKB (forward_compiled.forward_algorithm, backward_compiled.main ...).
+        facts_base and question are ids of original"""
+        facts = self.facts(facts_base)
+        if self.new_id[question] != -1 :
+            return algorithm(self.kb, facts, self.new_id[question])
+
+        rule = self.chain_rule[question]
+        position = self.chain_pos[question]
+        for v in facts_base :
+            if self.chain_rule[v] == rule and self.new_id[v] == -1 and self.chain_pos[v] <= position :
+                return True
+        return algorithm(self.kb, facts, self.kb.antecedents(rule)[0])
+
+
+'''
+Description : contracts the chains of unit rules of a CompiledKB.
+
+Input : "kb", a CompiledKB
+Output : a ContractedKB
+
+Example : for A => B, B => C, C => D, C ∧ E => F : B is inside a chain,
+          the contracted kb is A => C (length 2), C => D, C ∧ E => F
+'''
+def contract(kb) :
+    ant_offsets = kb.ant_offsets
+    csq_offsets = kb.csq_offsets
+    heads = kb.heads
+    body_len = kb.body_len
+
+    inside = bytearray(kb.n_vars)
+    for v in range(kb.n_vars) :
+        if ant_offsets[v+1] - ant_offsets[v] == 1 and csq_offsets[v+1] - csq_offsets[v] == 1 :
+            if body_len[kb.ant_rules[ant_offsets[v]]] == 1 and body_len[kb.csq_rules[csq_offsets[v]]] == 1 :
+                inside[v] = 1
+
+    done = bytearray(kb.n_vars)
+    names = []
+    new_id = array('i', [-1]) * kb.n_vars
+    body_offsets = array('i', [0])
+    body_vars = array('i')
+    new_heads = array('i')
+    lengths = array('i')
+    chain_rows = array('i')
+    chain_vars = array('i')
+
+    def intern(v) :
+        if new_id[v] == -1 :
+            new_id[v] = len(names)
+            names.append(kb.names[v])
+        return new_id[v]
+
+    def add_rule(rule) :
+        """adds a rule of kb with no antecedent inside a chain, and the chain it starts"""
+        r = len(new_heads)
+        for antecedent in kb.antecedents(rule) :
+            body_vars.append(intern(antecedent))
+        body_offsets.append(len(body_vars))
+        head = heads[rule]
+        length = 1
+        while inside[head] :
+            done[head] = 1
+            chain_rows.append(r)
+            chain_vars.append(head)
+            head = heads[kb.ant_rules[ant_offsets[head]]]
+            length += 1
+        new_heads.append(intern(head))
+        lengths.append(length)
+
+    for rule in range(kb.n_rules) :
+        if not inside[kb.antecedents(rule)[0]] :
+            add_rule(rule)
+    # what is left inside chains are cycles of unit rules : each one is cut at a variable
+    for v in range(kb.n_vars) :
+        if inside[v] and not done[v] :
+            inside[v] = 0
+            add_rule(kb.ant_rules[ant_offsets[v]])
+    # variables in no rule (facts, question)
+    for v in range(kb.n_vars) :
+        if new_id[v] == -1 and ant_offsets[v+1] == ant_offsets[v] and csq_offsets[v+1] == csq_offsets[v] :
+            intern(v)
+
+    contracted = CompiledKB(names, body_offsets, body_vars, new_heads)
+    chain_offsets, chain_vars = build_csr(chain_rows, chain_vars, contracted.n_rules)
+    return ContractedKB(kb, contracted, new_id, lengths, chain_offsets, chain_vars)
@@ -49,6 +49,7 @@ maxLengthAntecedentsDefault = 3
 maxLengthFactsBaseDefault = 10
 maxLengthDataBaseDefault = 30
 symbolDefault = et
+groupsDefault = 4
 variableBaseDefault = ['P1', 'P2', 'P3', 'P4', 'P5', 'A1', 'A2', 'A3', 'A4', 'A5', 'Z1', 'Z2', 'Z3', 'Z4', 'Z5']
 
 def generateRules (listOfVariable, symbol, maxRulesNumber=maxRulesNumberDefault, maxLengthAntecedents=maxLengthAntecedentsDefault) :
@@ -94,10 +95,14 @@ def generateRulesBenchmark2(k, n=1, variableBase=[]) :
    
     return rules
 
-def generateRulesBenchmark3(k, oriented) :
+# variableBase is only filled if it is given : generateBenchmark gives it with
+# questionBenchmark3=True, the question is then P(k-1) instead of None
+def generateRulesBenchmark3(k, oriented, variableBase=None) :
     rules = []
     for i in range (k) :
         antecedent = "P" + str(i)
+        if variableBase is not None :
+            variableBase.append(antecedent)
         if oriented :
             for j in range (i+1,k) :
                 consequent = "P" + str(j)
@@ -147,6 +152,31 @@ def generateRulesBenchmark5(k, n, variableBase=[]) :
     
     return rules
 
+# k rules whose n first antecedents are drawn from a few groups : rule j is
+# P0 ∧ ... ∧ P(h-1) ∧ Ph.g ∧ ... ∧ P(n-1).g ∧ Q.j => Q.(j+1) with g = j % groups and
+# h = n // 2, every rule shares its h first antecedents and the rules of a group share
+# all n. The facts are the n first antecedents of every group and Q.0
+def generateRulesBenchmark6(k, n, variableBase=[], symbol=symbolDefault, groups=groupsDefault) :
+    rules = []
+    shared = n // 2
+    prefixes = []
+    for g in range(groups) :
+        prefix = ""
+        for i in range(n) :
+            antecedent = "P" + str(i) if i < shared else "P" + str(i) + "." + str(g)
+            prefix += antecedent + " " + symbol + " "
+            if antecedent not in variableBase :
+                variableBase.append(antecedent)
+        prefixes.append(prefix)
+    for j in range(k) :
+        antecedent = "Q." + str(j)
+        consequent = "Q." + str(j+1)
+        if antecedent not in variableBase :
+            variableBase.append(antecedent)
+        variableBase.append(consequent)
+        rules.append([prefixes[j % groups] + antecedent, consequent])
+
+    return rules
 
 def generateConsequent(listOfConsequents) :
     consequent = choice(listOfConsequents)
@@ -192,6 +222,18 @@ def generateFBBenchmark(rules, n, benchmark) :
           length = len(rules)
           if len(rules) > 0 :
                FactsBase.append(rules[0][0])
+    elif benchmark == 6 :
+          # the n first antecedents of the first rule of each group, until a group comes back
+          prefixes = set()
+          for antecedents, consequent in rules :
+               antecedents = antecedents.split(" " + et + " ")
+               if tuple(antecedents[:n]) in prefixes :
+                    break
+               prefixes.add(tuple(antecedents[:n]))
+               FactsBase += antecedents[:n]
+          FactsBase = list(dict.fromkeys(FactsBase))
+          if len(rules) > 0 :
+               FactsBase.append(rules[0][0].split(" " + et + " ")[n])
          
     
     return FactsBase
@@ -230,7 +272,7 @@ def generateSet(elementsNumber, variableBase=variableBaseDefault, maxRulesNumber
     return set
 
 #@profile
-def generateBenchmark(k, n=1, benchmark=1, variableBase=[], oriented=False) :
+def generateBenchmark(k, n=1, benchmark=1, variableBase=[], oriented=False, questionBenchmark3=False) :
     set = []
     element = {}
     if benchmark == 1 :
@@ -241,7 +283,7 @@ def generateBenchmark(k, n=1, benchmark=1, variableBase=[], oriented=False) :
         element["facts base"]= generateFBBenchmark(element["rules"], n, 2)
         #element["facts base"]= []
     elif benchmark == 3 :
-        element["rules"]= generateRulesBenchmark3(k, oriented, variableBase)
+        element["rules"]= generateRulesBenchmark3(k, oriented, variableBase if questionBenchmark3 else None)
         element["facts base"]= generateFBBenchmark(element["rules"], n, 3)
     elif benchmark == 4 :
          element["rules"]= generateRulesBenchmark4(k, variableBase)
@@ -249,6 +291,9 @@ def generateBenchmark(k, n=1, benchmark=1, variableBase=[], oriented=False) :
     elif benchmark ==  5 :
          element["rules"]= generateRulesBenchmark5(k, n, variableBase)
          element["facts base"]= generateFBBenchmark(element["rules"], n, 5)
+    elif benchmark ==  6 :
+         element["rules"]= generateRulesBenchmark6(k, n, variableBase)
+         element["facts base"]= generateFBBenchmark(element["rules"], n, 6)
     element["question"]= generateQuestion(variableBase, cheat=variableBase)
 
 
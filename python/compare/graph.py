@@ -0,0 +1,111 @@
+'''
+Description : graph algorithms on the variable dependency graph of a CompiledKB.
+
+There is an edge a -> c when a is an antecedent of a rule whose consequent is c.
+The successors of a are therefore heads[r] for r in kb.rules_of(a).
+'''
+
+from array import array
+
+from compiled import build_csr
+
+
+'''
+Description : strongly connected components of the variable dependency graph,
+with an iterative version of Tarjan's algorithm (no recursion, so no limit on the
+depth of the graph).
+
+Input : "kb", a CompiledKB
+Output : (comp, n_comp) where comp[v] is the component of variable v.
+         Components are numbered in the order Tarjan's algorithm closes them :
+         every edge between two different components goes from a higher number
+         to a lower one, so decreasing numbers are a topological order.
+
+Example : for A => B, B => A, B => C : comp = [1, 1, 0], n_comp = 2
+'''
+def strongly_connected_components(kb) :
+    n = kb.n_vars
+    ant_offsets = kb.ant_offsets
+    ant_rules = kb.ant_rules
+    heads = kb.heads
+
+    index = array('i', [-1]) * n
+    low = array('i', [0]) * n
+    comp = array('i', [-1]) * n
+    on_stack = bytearray(n)
+    stack = []
+    counter = 0
+    n_comp = 0
+
+    for source in range(n) :
+        if index[source] != -1 :
+            continue
+        index[source] = low[source] = counter
+        counter += 1
+        stack.append(source)
+        on_stack[source] = 1
+        # the call stack holds (variable, position of the next edge to explore)
+        calls = [(source, ant_offsets[source])]
+
+        while calls :
+            v, i = calls[-1]
+            end = ant_offsets[v+1]
+            while i < end :
+                w = heads[ant_rules[i]]
+                i += 1
+                if index[w] == -1 :
+                    calls[-1] = (v, i)
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    calls.append((w, ant_offsets[w]))
+                    break
+                elif on_stack[w] and index[w] < low[v] :
+                    low[v] = index[w]
+            else :
+                # every edge of v has been explored
+                calls.pop()
+                if low[v] == index[v] :
+                    while True :
+                        w = stack.pop()
+                        on_stack[w] = 0
+                        comp[w] = n_comp
+                        if w == v :
+                            break
+                    n_comp += 1
+                if calls :
+                    u = calls[-1][0]
+                    if low[v] < low[u] :
+                        low[u] = low[v]
+
+    return comp, n_comp
+
+
+def component_members(comp, n_comp) :
+    """returns (offsets, members) : the variables of component c are members[offsets[c]:offsets[c+1]]"""
+    return build_csr(comp, array('i', range(len(comp))), n_comp)
+
+
+'''
+Description : level of each component in the condensation of the dependency graph,
+the length of the longest path from a component without predecessor.
+Two components of the same level are never linked by an edge.
+
+Input : "kb", a CompiledKB, and (comp, n_comp) from strongly_connected_components
+Output : an array('i') level[c] for each component c
+'''
+def component_levels(kb, comp, n_comp) :
+    offsets, members = component_members(comp, n_comp)
+    level = array('i', [0]) * n_comp
+    heads = kb.heads
+
+    # decreasing numbers are a topological order of the components
+    for c in range(n_comp - 1, -1, -1) :
+        next_level = level[c] + 1
+        for v in members[offsets[c]:offsets[c+1]] :
+            for rule in kb.rules_of(v) :
+                d = comp[heads[rule]]
+                if d != c and level[d] < next_level :
+                    level[d] = next_level
+    return level
@@ -6,12 +6,18 @@ import json
 
 from algorithms import forwardV3 as forward
 from algorithms import backwardV5 as backward
+from algorithms import backwardV7 as backward_iterative
+from algorithms import forward_compiled
+from algorithms import backward_compiled
+from algorithms import forward_rete
+from algorithms import bidirectional
 
 from benchmarks import benchmark1 as b1
 from benchmarks import benchmark2 as b2
 from benchmarks import benchmark3 as b3
 from benchmarks import benchmark4 as b4
 from benchmarks import benchmark5 as b5
+from benchmarks import benchmark6 as b6
 
 relative_path = "compare/data/"
 data_path = os.path.join(os.getcwd(), relative_path)
@@ -49,6 +55,8 @@ def get_module(benchmark_name):
         return b4
     elif benchmark_name == 'b5' or benchmark_name == 'benchmark5':
         return b5
+    elif benchmark_name == 'b6' or benchmark_name == 'benchmark6':
+        return b6
     else:
         raise ValueError(f"Benchmark inconnu: {benchmark_name}")
 
@@ -57,6 +65,16 @@ def get_algorithm(alg_name):
         return forward
     elif alg_name == 'backward':
         return backward
+    elif alg_name == 'backward_iterative':
+        return backward_iterative
+    elif alg_name == 'forward_compiled':
+        return forward_compiled
+    elif alg_name == 'backward_compiled':
+        return backward_compiled
+    elif alg_name == 'forward_rete':
+        return forward_rete
+    elif alg_name == 'bidirectional':
+        return bidirectional
     else:
         raise ValueError(f"Algorithme inconnu: {alg_name}")
 
@@ -65,6 +83,13 @@ def get_algorithm(alg_name):
                   Data is loaded from a JSON file
     Input:
         benchmark: A module object representing the benchmark.
+        layout: 'objects' (default), 'slots' or 'columns', the classes used
+                for variables and rules (cf classes.Layout)
+        normalise: if True, duplicate antecedents, identical rules and subsumed
+                   rules are removed (cf classes.normaliseRules) and what was
+                   removed is printed
+        pauseGC: if True, the garbage collector is disabled while the rules
+                 are normalised (cf classes.normaliseRules)
 
     Returns:
         A tuple containing:
@@ -76,7 +101,7 @@ def get_algorithm(alg_name):
         >>> import benchmark1
         >>> R, FB, Q = loadBenchmark(benchmark1)
 '''
-def load_benchmark(benchmark) :
+def load_benchmark(benchmark, layout='objects', normalise=False, pauseGC=False) :
     path_b = "benchmark" + get_module_number(benchmark) +"/" + "bench0.json"
     where = data_path + path_b 
     
@@ -86,7 +111,9 @@ def load_benchmark(benchmark) :
    
 
     for elem in data :
-        objet = classes.createSet(elem)
+        objet = classes.createSet(elem, layout, normalise, pauseGC)
+        if normalise :
+            print_normalisation(objet['normalisation'])
         R = objet['rules']
         FB = objet['facts base']
         Q = objet['question']
@@ -101,6 +128,13 @@ def load_benchmark(benchmark) :
                   Data is loaded from python dictionary and not a JSON file
     Input:
         benchmark: A module object representing the benchmark.
+        layout: 'objects' (default), 'slots' or 'columns', the classes used
+                for variables and rules (cf classes.Layout)
+        normalise: if True, duplicate antecedents, identical rules and subsumed
+                   rules are removed (cf classes.normaliseRules) and what was
+                   removed is printed
+        pauseGC: if True, the garbage collector is disabled while the rules
+                 are normalised (cf classes.normaliseRules)
 
     Returns:
         A tuple containing:
@@ -113,11 +147,21 @@ def load_benchmark(benchmark) :
         >>> R, FB, Q = loadBenchmark(benchmark1)
 '''
 
-def load_benchmark2(data) :
+def load_benchmark2(data, layout='objects', normalise=False, pauseGC=False) :
    
-    objet = classes.createSet2(data)
+    objet = classes.createSet2(data, layout, normalise, pauseGC)
+    if normalise :
+        print_normalisation(objet['normalisation'])
     R = objet['rules']
     FB = objet['facts base']
     Q = objet['question']
 
-    return R,FB,Q
\ No newline at end of file
+    return R,FB,Q
+
+
+def print_normalisation(report) :
+    """prints what classes.normaliseRules removed from a rule base"""
+    removed = report['rules'] - report['kept']
+    print(f"Normalisation: {report['rules']} rules, {removed} removed "
+          f"({report['identical rules']} identical, {report['subsumed rules']} subsumed), "
+          f"{report['duplicate antecedents']} duplicate antecedents removed, {report['kept']} rules kept")
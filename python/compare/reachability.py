@@ -0,0 +1,167 @@
+'''
+Description : a precomputed index of the implication graph of the unit rules
+(rules with a single antecedent), to answer "is X derivable from the single fact Y"
+by a lookup instead of a forward chaining.
+
+Y derives X when X is reachable from Y in the graph of the unit rules. The graph is
+condensed in its strongly connected components (graph.py) : the variables of a
+component derive each other. The components are then numbered by a depth first
+search of the condensation (post[c]), and each component c receives the list of
+intervals of numbers of the components it reaches (labels) : the interval of its
+subtree in the search, merged with the labels of its successors. A k-ary tree
+(benchmark5) has one interval per component, a dense cyclic base (benchmark3 not
+oriented) a single component.
+
+Rules with two antecedents or more are not in the graph : if the base has some,
+a True answer is still right but a False answer may be wrong (index.complete is False).
+'''
+
+import json
+from array import array
+from bisect import bisect_right
+
+import graph
+from compiled import build_csr, compile_rules
+
+
+class ReachabilityIndex :
+    """the index of a rule base :
+    - names, index : name of each variable and {name : variable}
+    - comp : component of each variable
+    - post : number of each component in the depth first search
+    - label_offsets, label_low, label_high : the intervals [low, high] of post numbers
+      reached by component c are at label_offsets[c]:label_offsets[c+1]
+    - complete : True if every rule of the base is a unit rule"""
+
+    def __init__(self, names, comp, post, label_offsets, label_low, label_high, complete) :
+        self.names = names
+        self.index = {name : v for v, name in enumerate(names)}
+        self.comp = comp
+        self.post = post
+        self.label_offsets = label_offsets
+        self.label_low = label_low
+        self.label_high = label_high
+        self.complete = complete
+
+    def derivable(self, variable, fact) :
+        """True if variable is derived from the fact base [fact] by the unit rules"""
+        variable = variable if isinstance(variable, str) else variable.name
+        fact = fact if isinstance(fact, str) else fact.name
+        x = self.index.get(variable)
+        y = self.index.get(fact)
+        if x is None or y is None :
+            # a variable in no rule is only derived from itself
+            return variable == fact
+        p = self.post[self.comp[x]]
+        c = self.comp[y]
+        start = self.label_offsets[c]
+        i = bisect_right(self.label_low, p, start, self.label_offsets[c+1]) - 1
+        return i >= start and self.label_high[i] >= p
+
+    def memory_size(self) :
+        """size in bytes of the integer arrays (names and index excluded)"""
+        size = 0
+        for attribute in ('comp', 'post', 'label_offsets', 'label_low', 'label_high') :
+            size += getattr(self, attribute).itemsize * len(getattr(self, attribute))
+        return size
+
+    def save(self, file) :
+        """stores the index in a JSON file"""
+        data = {'names' : self.names, 'complete' : self.complete}
+        for attribute in ('comp', 'post', 'label_offsets', 'label_low', 'label_high') :
+            data[attribute] = getattr(self, attribute).tolist()
+        with open(file, "w") as outfile :
+            json.dump(data, outfile)
+
+
+def load_index(file) :
+    """reads an index stored by ReachabilityIndex.save"""
+    with open(file) as infile :
+        data = json.load(infile)
+    arrays = [array('i', data[attribute]) for attribute in ('comp', 'post', 'label_offsets', 'label_low', 'label_high')]
+    return ReachabilityIndex(data['names'], *arrays, data['complete'])
+
+
+'''
+Description : builds the index of a rule base.
+
+Input : "rules", a list of Rule objects (the 'rules' of classes.createSet)
+Output : a ReachabilityIndex
+
+Example : build_index(classes.createSet(data)['rules']).derivable('P3', 'P0')
+'''
+def build_index(rules) :
+    unit_rules = []
+    variables = []
+    for rule in rules :
+        if len({antecedent.name for antecedent in rule.antecedents}) == 1 :
+            unit_rules.append(rule)
+        else :
+            variables += rule.antecedents
+            variables.append(rule.consequent)
+    kb = compile_rules(unit_rules, variables)
+    comp, n_comp = graph.strongly_connected_components(kb)
+
+    # edges of the condensation
+    sources = array('i')
+    targets = array('i')
+    for rule in range(kb.n_rules) :
+        c = comp[kb.antecedents(rule)[0]]
+        d = comp[kb.heads[rule]]
+        if c != d :
+            sources.append(c)
+            targets.append(d)
+    offsets, successors = build_csr(sources, targets, n_comp)
+
+    # depth first search of the condensation : the subtree of c is [low[c], post[c]].
+    # A successor has a lower number than its component, so a search started from the
+    # highest numbers first visits the components without predecessor
+    post = array('i', [-1]) * n_comp
+    low = array('i', [0]) * n_comp
+    counter = 0
+    for source in range(n_comp - 1, -1, -1) :
+        if post[source] != -1 :
+            continue
+        post[source] = -2
+        low[source] = counter
+        calls = [(source, offsets[source])]
+        while calls :
+            c, i = calls[-1]
+            while i < offsets[c+1] :
+                d = successors[i]
+                i += 1
+                if post[d] == -1 :
+                    calls[-1] = (c, i)
+                    post[d] = -2
+                    low[d] = counter
+                    calls.append((d, offsets[d]))
+                    break
+            else :
+                calls.pop()
+                post[c] = counter
+                counter += 1
+
+    # labels, successors first : increasing numbers of components
+    label_offsets = array('i', [0])
+    label_low = array('i')
+    label_high = array('i')
+    for c in range(n_comp) :
+        intervals = [(low[c], post[c])]
+        for d in successors[offsets[c]:offsets[c+1]] :
+            for i in range(label_offsets[d], label_offsets[d+1]) :
+                intervals.append((label_low[i], label_high[i]))
+        intervals.sort()
+        lo, hi = intervals[0]
+        for next_lo, next_hi in intervals[1:] :
+            if next_lo <= hi + 1 :
+                hi = max(hi, next_hi)
+            else :
+                label_low.append(lo)
+                label_high.append(hi)
+                lo, hi = next_lo, next_hi
+        label_low.append(lo)
+        label_high.append(hi)
+        label_offsets.append(len(label_low))
+
+    return ReachabilityIndex(list(kb.names), comp, post, label_offsets, label_low, label_high,
+                             len(unit_rules) == len(rules))
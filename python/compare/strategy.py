@@ -0,0 +1,260 @@
+'''
+Description : automatic choice of the engine that answers a question on a CompiledKB.
+
+forward and backward trade places with the shape of the base (time_measuring) : the
+forward chaining goes through everything the facts derive, the backward chaining
+through the rules the question depends on, and it stops at the first proof. A
+Reasoner computes the statistics of its kb once, when it is built : the number of
+antecedents of the kb and, for each component of the dependency graph (graph.py), the
+size of its cone, the rules its variables depend on. The cone of a component is its
+own rules plus the cones of the components its rules read, summed in topological
+order : this is exact when the condensation is a tree (benchmark5), an
+upper bound when a component is reached by two paths, and it is capped by the size
+of the kb. Choosing an engine is then a few lookups, whatever the size of the cone.
+
+The cost model gives the time of each engine as a linear function of a few of these
+numbers (features) :
+ - forward  : 1, facts, antecedents of the kb
+ - sliced   : 1, facts, antecedents of the cone
+ - backward : 1, facts, antecedents of the cone divided by its fan-in, the average
+              number of rules per consequent of the cone (with n rules per
+              consequent, the first one proven ends the search)
+and the engine with the lowest estimate answers. The first sliced query of a question
+also walks its cone to build its relevance slice (forward_compiled.relevance_slice),
+SLICE seconds per antecedent, the next ones reuse it.
+The coefficients are fitted by calibrate on CSV files in the format of time_measuring :
+MODEL is calibrate(glob.glob("data/calibration/*.csv")), the times (mean of 5 runs) of
+forward_compiled, forward_sliced and backward_compiled on benchmarks 1 to 6, measured
+by time_measuring with generated=True.
+'''
+
+import csv
+import os
+import re
+
+import numpy as np
+
+import classes
+import compiled
+import generateData
+import graph
+from algorithms import backward_compiled, forward_compiled
+
+
+STRATEGIES = ('forward', 'sliced', 'backward')
+
+# engine of time_measuring each strategy is calibrated on
+ALGORITHMS = {'forward' : 'forward_compiled', 'sliced' : 'forward_sliced', 'backward' : 'backward_compiled'}
+
+# seconds per unit of each feature
+MODEL = {
+    'forward' : (6.00e-6, 4.27e-7, 2.76e-7),
+    'sliced' : (3.73e-6, 5.48e-7, 1.33e-7),
+    'backward' : (1.73e-5, 1.42e-6, 5.44e-7),
+}
+
+# seconds per antecedent of the cone to build a relevance slice, the median of
+# the times of relevance_slice on the questions of benchmarks 1 to 6
+SLICE = 2.3e-6
+
+
+class Statistics :
+    """the numbers the cost model is computed from, once per kb :
+    - entries : number of antecedents of the kb
+    - comp : component of each variable in the dependency graph
+    - cone_rules, cone_entries, cone_heads : for each component, the rules of its cone,
+      their antecedents and the number of variables of its cone that are a consequent"""
+
+    def __init__(self, kb) :
+        self.kb = kb
+        self.entries = len(kb.body_vars)
+        self.comp, n_comp = graph.strongly_connected_components(kb)
+        offsets, members = graph.component_members(self.comp, n_comp)
+        comp = self.comp
+        body_len = kb.body_len
+        self.cone_rules = [0] * n_comp
+        self.cone_entries = [0] * n_comp
+        self.cone_heads = [0] * n_comp
+
+        # decreasing numbers are a topological order : the components read by the
+        # rules of c have a higher number, their cones are known
+        for c in range(n_comp - 1, -1, -1) :
+            n_rules = entries = heads = 0
+            above = set()
+            for v in members[offsets[c]:offsets[c+1]] :
+                rules = kb.rules_for(v)
+                if len(rules) :
+                    heads += 1
+                n_rules += len(rules)
+                for rule in rules :
+                    entries += body_len[rule]
+                    for antecedent in kb.antecedents(rule) :
+                        if comp[antecedent] != c :
+                            above.add(comp[antecedent])
+            for d in above :
+                n_rules += self.cone_rules[d]
+                entries += self.cone_entries[d]
+                heads += self.cone_heads[d]
+            self.cone_rules[c] = min(n_rules, kb.n_rules)
+            self.cone_entries[c] = min(entries, self.entries)
+            self.cone_heads[c] = min(heads, kb.n_vars)
+
+    def cone(self, question) :
+        """(entries, fan_in) of the cone of question"""
+        c = self.comp[question]
+        heads = self.cone_heads[c]
+        return self.cone_entries[c], self.cone_rules[c] / heads if heads else 1
+
+    def features(self, strategy, question, n_facts) :
+        """the numbers the cost of strategy is linear in"""
+        if strategy == 'forward' :
+            return (1, n_facts, self.entries)
+        entries, fan_in = self.cone(question)
+        if strategy == 'sliced' :
+            return (1, n_facts, entries)
+        return (1, n_facts, entries / fan_in)
+
+
+class Reasoner :
+    """answers questions on a CompiledKB and a fact base, with the engine
+    the cost model expects to be the fastest"""
+
+    def __init__(self, kb, facts_base=(), model=None) :
+        self.kb = kb
+        self.facts = list(facts_base)
+        self.model = MODEL if model is None else model
+        self.slices = forward_compiled.SliceCache(kb)
+        self.statistics = Statistics(kb)
+        self.state = forward_compiled.pre_processing(kb, self.facts)
+        self.session = backward_compiled.BackwardSession(kb, self.facts)
+
+    def estimate(self, strategy, question) :
+        """estimated time of strategy, in seconds"""
+        features = self.statistics.features(strategy, question, len(self.facts))
+        time = sum(c * x for c, x in zip(self.model[strategy], features))
+        if strategy == 'sliced' and question not in self.slices.slices :
+            time += SLICE * features[2]
+        return time
+
+    def choose(self, question) :
+        """the strategy with the lowest estimated time"""
+        question = self.id_of(question)
+        return min(STRATEGIES, key=lambda strategy : self.estimate(strategy, question))
+
+    def ask(self, question, strategy="auto") :
+        """True if question is a logical consequence of the fact base.
+        strategy is 'auto', 'forward', 'sliced' or 'backward'"""
+        question = self.id_of(question)
+        if strategy == "auto" :
+            strategy = self.choose(question)
+        if strategy == 'forward' :
+            self.state.reset(self.facts)
+            return forward_compiled.run(self.kb, self.state, question)
+        elif strategy == 'sliced' :
+            self.state.reset(self.facts)
+            return forward_compiled.run_sliced(self.kb, self.state, question, self.slices.get(question))
+        elif strategy == 'backward' :
+            return self.session.ask(question)
+        raise ValueError(f"Stratégie inconnue: {strategy}")
+
+    def id_of(self, question) :
+        """a question is an id, a name or a Variable object"""
+        if isinstance(question, int) :
+            return question
+        return self.kb.id_of(question)
+
+
+'''
+Description : reads the file name and the rows of a CSV file written by
+time_measuring.save_execution_times_to_csv.
+
+Input : "file", a CSV file named <alg>b<benchmark>k<k>n<max>p<step>r<rep>.csv
+Output : (alg, benchmark number, k, [(size, time), ...]), None if the name does not match
+
+Example : read_times("forward_compiledbb2k5n100p10r10.csv") returns ('forward_compiled', 2, 5, [(1, 0.0001), ...])
+'''
+def read_times(file) :
+    match = re.fullmatch(r'(\w+?)b(?:b|benchmark)?(\d+)k(\d+)n\d+p\d+r\d+\.csv', os.path.basename(file))
+    if match is None :
+        return None
+    with open(file) as infile :
+        rows = [(int(row['Size']), float(row['Time'])) for row in csv.DictReader(infile)]
+    return match.group(1), int(match.group(2)), int(match.group(3)), rows
+
+
+'''
+Description : fits the coefficients of the cost model on the times measured by time_measuring.
+
+Each row of a CSV file of forward_compiled, forward_sliced or backward_compiled is a
+benchmark (its number and k are in the file name, n is the size of the row) : the
+benchmark is generated again, its statistics are computed for its question, and the
+coefficients of each strategy are fitted on the times by fit_log. A strategy with no
+file keeps the coefficients of model.
+
+Input : "files", CSV files of time_measuring
+        "model", the coefficients to start from (MODEL by default)
+Output : a model, to give to a Reasoner
+
+Example : Reasoner(kb, facts, calibrate(glob.glob("*.csv")))
+'''
+def calibrate(files, model=None) :
+    model = dict(MODEL if model is None else model)
+    samples = {strategy : ([], []) for strategy in STRATEGIES}
+    strategy_of = {alg : strategy for strategy, alg in ALGORITHMS.items()}
+    generated = {}      # (benchmark, k, n) : {strategy : features}
+    for file in files :
+        times = read_times(file)
+        if times is None or times[0] not in strategy_of :
+            continue
+        alg, benchmark, k, rows = times
+        features, measured = samples[strategy_of[alg]]
+        for n, time in rows :
+            if (benchmark, k, n) not in generated :
+                element = generateData.generateBenchmark(k, n, benchmark=benchmark, variableBase=[], questionBenchmark3=True)[0]
+                data = classes.createSet(element)
+                kb, facts, question = compiled.compile_set(data['rules'], data['facts base'], data['question'])
+                statistics = Statistics(kb)
+                generated[benchmark, k, n] = {strategy : statistics.features(strategy, question, len(facts))
+                                              for strategy in STRATEGIES}
+            features.append(generated[benchmark, k, n][strategy_of[alg]])
+            measured.append(time)
+
+    for strategy, (features, measured) in samples.items() :
+        if features :
+            model[strategy] = fit_log(features, measured)
+    return model
+
+
+'''
+Description : non negative coefficients c such that the time of each row is about
+sum(c[j] * features[j]), with the least squares error on the logarithms of the times.
+
+The times of the benchmarks go from microseconds to seconds : with the absolute
+error the largest benchmarks decide alone, and with the relative error an
+overestimate counts more than an underestimate (at most 1), so every coefficient is
+pulled toward 0. The error on the logarithms treats both the same way. c = exp(theta)
+keeps the coefficients positive, theta is found by Gauss-Newton steps (damped and
+bounded), starting from each feature explaining an equal part of the median time.
+
+Input : "features", a list of tuples of numbers, "times", the time of each tuple
+Output : a tuple of coefficients, one per feature
+
+Example : fit_log([(1, 10), (1, 100)], [2e-6, 11e-6]) returns about (1e-6, 1e-7)
+'''
+def fit_log(features, times, iterations=200) :
+    features = np.array(features, dtype=float)
+    times = np.array(times, dtype=float)
+    n_features = features.shape[1]
+    logs = np.log(times)
+    ratios = times[:, None] / np.maximum(features, 1e-12)
+    theta = np.log(np.median(ratios, axis=0) / n_features)
+    damping = 1e-3 * np.eye(n_features)
+    for _ in range(iterations) :
+        coefficients = np.exp(theta)
+        estimates = features @ coefficients
+        jacobian = features * coefficients / estimates[:, None]
+        step = np.linalg.lstsq(np.vstack([jacobian, damping]),
+                               np.concatenate([logs - np.log(estimates), np.zeros(n_features)]),
+                               rcond=None)[0]
+        theta += np.clip(step, -2, 2)
+    return tuple(float(c) for c in np.exp(theta))
@@ -15,6 +15,34 @@ import numpy as np
 #import of algortihms
 from algorithms import backwardV5 as backward
 from algorithms import forwardV3 as forward
+from algorithms import forward_compiled
+from algorithms import backward_compiled
+from algorithms import forward_bitparallel
+from algorithms import forward_sparse
+from algorithms import backwardV7 as backward_iterative
+from algorithms import forward_incremental
+from algorithms import backward_scc
+from algorithms import forward_unit
+from algorithms import forward_rete
+from algorithms import bidirectional
+from algorithms import horn_sat
+from algorithms import forward_materialized
+from algorithms import anytime
+from algorithms import forward_stream
+
+#import of the compiled kb and of the generators of the differential checks
+import classes
+import compiled
+import random
+from array import array
+import math
+import reachability
+import tempfile
+import contraction
+import gc
+import generateData
+import strategy
+from contextlib import redirect_stdout
 
 #import of benchmarks
 from benchmarks import benchmark1 as b1
@@ -34,6 +62,8 @@ import time
 import timeit as timeit
 from time import perf_counter
 import copy
+import gc
+import tracemalloc
 
 
 import resource
@@ -744,6 +774,32 @@ def measure_sizes(facts_base, rules):
 
 
 
+'''Description : Compares the memory of the objects, slots and columns layouts of classes (cf classes.Layout)
+on a benchmark : measure_sizes for each layout, plus the memory allocated to build the whole set'''
+def measure_layout_sizes(benchmark, k, n):
+    data = benchmark.create_benchmark2(k=k,n=n,show=False)
+
+    for layout in ('objects', 'slots', 'columns'):
+        gc.collect()
+        tracemalloc.start()
+        rules, facts_base, question = load_data.load_benchmark2(data, layout)
+        allocated, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"Layout: {layout}")
+        measure_sizes(facts_base, rules)
+        # sys.getsizeof does not count the __dict__ of an object
+        if facts_base and hasattr(facts_base[0], '__dict__'):
+            print(f"Size of the __dict__ of one fact: {sys.getsizeof(facts_base[0].__dict__)} bytes")
+        if facts_base and hasattr(facts_base[0], 'columns'):
+            print(f"Size of the shared columns: {facts_base[0].columns.memory_size()} bytes")
+        print(f"Memory allocated by the set: {allocated} bytes")
+        print()
+
+        del rules, facts_base, question
+
+
+
 def test_generate_and_process_benchmark(facts_base,rules,question):
     # Pre-process the data using backward_pre_processing
     # Run the main algorithm on the question variable
@@ -801,6 +857,688 @@ def measure_execution_time(benchmark, k, sizes, repeat):
 
 
 
+########################DIFFERENTIAL CHECKS########################
+# Every engine is compared to least_model, the closure of the facts by the rules
+# computed the naive way (apply every rule until nothing changes), on small random
+# bases : each check returns its number of mismatches.
+# python -c "import test; test.check_all()"
+
+
+'''
+Description : a random rule base in the format of the benchmarks, over the variables P0 ... P(n_vars-1)
+
+Input : "seed", the seed of the generator, the same seed gives the same base
+Output : {'rules' : [['P1 ∧ P4', 'P2'], ...], 'facts base' : ['P3', ...], 'question' : 'P7'}
+'''
+def random_base(seed, n_vars=12, n_rules=30, max_antecedents=3, n_facts=3) :
+    generator = random.Random(seed)
+    variables = ['P%d' % i for i in range(n_vars)]
+    rules = []
+    for _ in range(generator.randint(1, n_rules)) :
+        antecedents = generator.sample(variables, generator.randint(1, max_antecedents))
+        rules.append([f" {classes.et} ".join(antecedents), generator.choice(variables)])
+    facts_base = generator.sample(variables, generator.randint(0, n_facts))
+    return {'rules' : rules, 'facts base' : facts_base, 'question' : generator.choice(variables)}
+
+
+'''
+Description : the oracle of the checks, the least model of a base computed the naive way
+
+Input : "element", a base in the format of random_base
+Output : the set of the names of the variables that are logical consequences of the facts (facts included)
+'''
+def least_model(element) :
+    rules = [({name.strip() for name in rule[0].split(classes.et)}, rule[1]) for rule in element['rules']]
+    model = set(element['facts base'])
+    changed = True
+    while changed :
+        changed = False
+        for antecedents, consequent in rules :
+            if consequent not in model and antecedents <= model :
+                model.add(consequent)
+                changed = True
+    return model
+
+
+def compile_base(element) :
+    data = classes.createSet(element)
+    return compiled.compile_set(data['rules'], data['facts base'], data['question'])
+
+
+'''
+Description : the engines of a CompiledKB that answer one question, engine(kb, facts_base, question),
+against least_model on every variable of each base
+'''
+def check_compiled_engines(seeds) :
+    engines = {
+        'forward_compiled' : forward_compiled.forward_algorithm,
+        'backward_compiled' : backward_compiled.main,
+        'forward_sparse' : forward_sparse.forward_algorithm,
+        'forward_sliced' : forward_compiled.forward_sliced,
+        'backward_scc' : backward_scc.main,
+        'forward_unit' : forward_unit.forward_algorithm,
+        'forward_rete' : forward_rete.forward_algorithm,
+        'bidirectional' : bidirectional.main,
+        'forward_stream' : forward_stream.forward_algorithm,
+    }
+    errors = 0
+    for seed in seeds :
+        element = random_base(seed)
+        model = least_model(element)
+        kb, facts, _ = compile_base(element)
+        for name, v in kb.index.items() :
+            for engine_name, engine in engines.items() :
+                if bool(engine(kb, facts, v)) != (name in model) :
+                    print(f"seed {seed} : {engine_name} is wrong on {name}")
+                    errors += 1
+    return errors
+
+
+'''
+Description : forward_batch on a batch of questions : every variable of the base, and random
+compound questions, (a1 ∧ a2) ∨ (b1 ∧ b2) or (a1 ∨ a2) ∧ (b1 ∨ b2), some of them with
+a variable that is in no rule, against least_model
+'''
+def check_forward_batch(seeds) :
+    errors = 0
+    for seed in seeds :
+        generator = random.Random(seed)
+        element = random_base(seed)
+        model = least_model(element)
+        kb, facts, _ = compile_base(element)
+        names = list(kb.index) + ['Unknown']
+        questions = list(kb.index)
+        expected = [name in model for name in kb.index]
+        for _ in range(10) :
+            inner, outer = generator.choice([(classes.et, classes.ou), (classes.ou, classes.et)])
+            expressions = [generator.sample(names, generator.randint(1, 3)) for _ in range(generator.randint(1, 3))]
+            questions.append(classes.Question([classes.Expression(e, inner) for e in expressions], outer))
+            values = [all(v in model for v in e) if inner == classes.et else any(v in model for v in e) for e in expressions]
+            expected.append(all(values) if outer == classes.et else any(values))
+        answers = forward_compiled.forward_batch(kb, facts, questions)
+        for question, answer, value in zip(questions, answers, expected) :
+            if answer != value :
+                print(f"seed {seed} : forward_batch is wrong on {question}")
+                errors += 1
+    return errors
+
+
+'''
+Description : forward_bitparallel on up to 130 fact bases at once (three words of lanes), against
+least_model on each base. Rules without antecedent are appended at the end of the kb, so that the
+last rule of a level, or every rule of a level, may have an empty body
+'''
+def check_bitparallel(seeds) :
+    errors = 0
+    for seed in seeds :
+        generator = random.Random(seed)
+        element = random_base(seed)
+        kb, _, _ = compile_base(element)
+        axioms = generator.sample(kb.names, generator.randint(0, min(2, kb.n_vars)))
+        body_offsets = list(kb.body_offsets) + [len(kb.body_vars)] * len(axioms)
+        heads = list(kb.heads) + [kb.index[name] for name in axioms]
+        kb = compiled.CompiledKB(list(kb.names), array('i', body_offsets), array('i', kb.body_vars), array('i', heads))
+        fact_bases = [generator.sample(kb.names, generator.randint(0, min(4, kb.n_vars))) for _ in range(generator.choice([1, 3, 64, 65, 130]))]
+        question = generator.choice(kb.names)
+        answers = forward_bitparallel.forward_algorithm(kb, fact_bases, question)
+        for b, facts_base in enumerate(fact_bases) :
+            model = least_model({'rules' : element['rules'], 'facts base' : facts_base + axioms})
+            if answers[b] != (question in model) :
+                print(f"seed {seed} : forward_bitparallel is wrong on {question}, fact base {b} of {len(fact_bases)}")
+                errors += 1
+    return errors
+
+
+'''
+Description : backwardV7 against backwardV5, on the answer and on the whole state they leave :
+value, order and successors of every variable, counter and successors of every rule,
+and the globals counter, root and on_list
+'''
+def check_backward_iterative(seeds) :
+    def run(module, element) :
+        module.counter = 0
+        module.root = math.inf
+        module.on_list = []
+        data = classes.createSet(element)
+        rules = data['rules']
+        module.pre_processing(rules, data['facts base'])
+        answer = module.main(data['question'])
+        variables = {}
+        for rule in rules :
+            for v in list(rule.antecedents) + [rule.consequent] :
+                variables[v.name] = (v.value, v.order, [str(x) for x in v.successors])
+        counters = [(rule.counter, [x.name for x in rule.successors]) for rule in rules]
+        return answer, variables, counters, module.counter, module.root, [v.name for v in module.on_list]
+
+    errors = 0
+    for seed in seeds :
+        element = random_base(seed, n_rules=25)
+        if run(backward, element) != run(backward_iterative, element) :
+            print(f"seed {seed} : backwardV7 leaves another state than backwardV5")
+            errors += 1
+    return errors
+
+
+'''
+Description : one BackwardSession asked random questions while its fact base is reset
+now and then : every answer against least_model
+'''
+def check_backward_session(seeds) :
+    errors = 0
+    for seed in seeds :
+        generator = random.Random(seed)
+        element = random_base(seed, n_facts=2)
+        kb, facts, _ = compile_base(element)
+        names = list(kb.index)
+        session = backward_compiled.BackwardSession(kb, facts)
+        facts_base = set(element['facts base'])
+        for _ in range(12) :
+            if generator.random() < 0.25 :
+                facts_base = set(generator.sample(names, min(len(names), generator.randint(0, 3))))
+                session.reset([kb.index[name] for name in facts_base])
+            model = least_model({'rules' : element['rules'], 'facts base' : list(facts_base)})
+            name = generator.choice(names)
+            if session.ask(kb.index[name]) != (name in model) :
+                print(f"seed {seed} : BackwardSession is wrong on {name}")
+                errors += 1
+    return errors
+
+
+'''
+Description : a BackwardSession with a BackwardMemo, asked random questions while its fact base
+is reset or extended : every answer, and every variable the memo holds as proven or refuted,
+against least_model
+'''
+def check_backward_memo(seeds) :
+    errors = 0
+    for seed in seeds :
+        generator = random.Random(seed)
+        element = random_base(seed, n_facts=2)
+        kb, facts, _ = compile_base(element)
+        names = list(kb.index)
+        session = backward_compiled.BackwardSession(kb, facts, backward_compiled.BackwardMemo())
+        facts_base = set(element['facts base'])
+        for _ in range(12) :
+            action = generator.random()
+            if action < 0.2 :
+                new = generator.sample(names, 1)
+                facts_base |= set(new)
+                session.add_facts([kb.index[name] for name in new])
+            elif action < 0.35 :
+                facts_base = set(generator.sample(names, min(len(names), generator.randint(0, 3))))
+                session.reset([kb.index[name] for name in facts_base])
+            model = least_model({'rules' : element['rules'], 'facts base' : list(facts_base)})
+            name = generator.choice(names)
+            if session.ask(kb.index[name]) != (name in model) :
+                print(f"seed {seed} : BackwardSession with a memo is wrong on {name}")
+                errors += 1
+            wrong = [v for v in session.proven if kb.names[v] not in model] + [v for v in session.refuted if kb.names[v] in model]
+            if wrong :
+                print(f"seed {seed} : the memo is wrong on {[kb.names[v] for v in wrong]}")
+                errors += len(wrong)
+    return errors
+
+
+'''
+Description : a ForwardSession fed the rules and the facts of a base in random interleaved
+chunks : after each chunk, its True variables and its answers against least_model
+'''
+def check_forward_session(seeds) :
+    errors = 0
+    for seed in seeds :
+        generator = random.Random(seed)
+        element = random_base(seed, n_facts=0)
+        rules = classes.createSet(element)['rules']
+        names = sorted({v.name for rule in rules for v in list(rule.antecedents) + [rule.consequent]})
+        session = forward_incremental.ForwardSession()
+        given = []
+        facts_base = set()
+        while len(given) < len(rules) or len(facts_base) < min(4, len(names)) :
+            if len(given) < len(rules) and generator.random() < 0.7 :
+                chunk = generator.randint(1, 4)
+                session.add_rules(rules[len(given):len(given) + chunk])
+                given += element['rules'][len(given):len(given) + chunk]
+            else :
+                new = generator.sample(names, min(len(names), generator.randint(1, 2)))
+                session.add_facts(new)
+                facts_base |= set(new)
+            model = least_model({'rules' : given, 'facts base' : list(facts_base)})
+            if set(session.true_names()) != model :
+                print(f"seed {seed} : ForwardSession is wrong")
+                errors += 1
+            name = generator.choice(names)
+            if session.ask(name) != (name in model) :
+                print(f"seed {seed} : ForwardSession.ask is wrong on {name}")
+                errors += 1
+    return errors
+
+
+'''
+Description : a ForwardSession adding and retracting facts (delete and rederive) : after each
+change, its True variables, the variables retract_facts says are gone, and the support of
+each variable (the number of fired rules whose consequent it is) against least_model
+'''
+def check_forward_retraction(seeds) :
+    errors = 0
+    for seed in seeds :
+        generator = random.Random(seed)
+        element = random_base(seed, n_facts=0)
+        rules = classes.createSet(element)['rules']
+        names = sorted({v.name for rule in rules for v in list(rule.antecedents) + [rule.consequent]})
+        session = forward_incremental.ForwardSession(rules)
+        facts_base = set()
+        for _ in range(15) :
+            before = set(session.true_names())
+            if facts_base and generator.random() < 0.45 :
+                out = generator.sample(sorted(facts_base), generator.randint(1, min(3, len(facts_base))))
+                gone = session.retract_facts(out)
+                facts_base -= set(out)
+                model = least_model({'rules' : element['rules'], 'facts base' : list(facts_base)})
+                if set(gone) != before - model :
+                    print(f"seed {seed} : ForwardSession.retract_facts returns the wrong variables")
+                    errors += 1
+            else :
+                new = generator.sample(names, min(len(names), generator.randint(1, 3)))
+                session.add_facts(new)
+                facts_base |= set(new)
+                model = least_model({'rules' : element['rules'], 'facts base' : list(facts_base)})
+            if set(session.true_names()) != model :
+                print(f"seed {seed} : ForwardSession is wrong after a retraction")
+                errors += 1
+            for name in names :
+                fired = sum(1 for r, (_, consequent) in enumerate(element['rules']) if consequent == name and session.counters[r] == 0)
+                if session.support[session.index[name]] != fired :
+                    print(f"seed {seed} : ForwardSession has a wrong support for {name}")
+                    errors += 1
+    return errors
+
+
+'''
+Description : the reachability index of the unit rules, on every pair (variable, fact) :
+derivable is never True when the closure of [fact] does not hold variable, it is exact
+when the index is complete, and load_index(save(...)) gives back the same index
+'''
+def check_reachability(seeds) :
+    errors = 0
+    with tempfile.TemporaryDirectory() as directory :
+        file = os.path.join(directory, 'index.json')
+        for seed in seeds :
+            generator = random.Random(seed)
+            element = random_base(seed, max_antecedents=generator.choice([1, 1, 2]))
+            index = reachability.build_index(classes.createSet(element)['rules'])
+            index.save(file)
+            loaded = reachability.load_index(file)
+            for attribute in ('names', 'comp', 'post', 'label_offsets', 'label_low', 'label_high', 'complete') :
+                if getattr(loaded, attribute) != getattr(index, attribute) :
+                    print(f"seed {seed} : load_index changes {attribute}")
+                    errors += 1
+            names = index.names + ['Unknown']
+            for fact in names :
+                model = least_model({'rules' : element['rules'], 'facts base' : [fact]})
+                for variable in names :
+                    derivable = index.derivable(variable, fact)
+                    if derivable and variable not in model :
+                        print(f"seed {seed} : {variable} is not derived from {fact}")
+                        errors += 1
+                    elif index.complete and derivable != (variable in model) :
+                        print(f"seed {seed} : the complete index misses {variable} from {fact}")
+                        errors += 1
+                    if loaded.derivable(variable, fact) != derivable :
+                        print(f"seed {seed} : the loaded index is wrong on {variable} from {fact}")
+                        errors += 1
+    return errors
+
+
+'''
+Description : the contraction of the chains of unit rules : forward_compiled and
+backward_compiled on the contracted kb against least_model on every variable, and
+the chains expanded give back the rules of the original kb
+'''
+def check_contraction(seeds) :
+    errors = 0
+    for seed in seeds :
+        generator = random.Random(seed)
+        n_vars = generator.choice([6, 12, 20])
+        element = random_base(seed, n_vars=n_vars, n_rules=generator.choice([5, 15, 40]), max_antecedents=generator.choice([1, 2]))
+        # chains of new variables between two variables of the base
+        variables = ['P%d' % i for i in range(n_vars)]
+        for c in range(generator.randint(0, 3)) :
+            chain = ['C%d_%d' % (c, i) for i in range(generator.randint(1, 6))]
+            path = [generator.choice(variables)] + chain + [generator.choice(variables)]
+            element['rules'] += [[a, b] for a, b in zip(path, path[1:])]
+            if generator.random() < 0.3 :
+                element['facts base'].append(generator.choice(chain))
+        model = least_model(element)
+        kb, facts, _ = compile_base(element)
+        contracted = contraction.contract(kb)
+        for name, v in kb.index.items() :
+            for engine in (forward_compiled.forward_algorithm, backward_compiled.main) :
+                if contracted.ask(engine, facts, v) != (name in model) :
+                    print(f"seed {seed} : the contracted kb is wrong on {name}")
+                    errors += 1
+        original = sorted((tuple(sorted(kb.antecedents(r))), kb.heads[r]) for r in range(kb.n_rules))
+        expanded = sorted((tuple(sorted(a)), c) for r in range(contracted.kb.n_rules) for a, c in contracted.expand(r))
+        if original != expanded :
+            print(f"seed {seed} : the expanded chains are not the original rules")
+            errors += 1
+    return errors
+
+
+'''
+Description : normaliseRules on random bases to which repeated antecedents, identical rules
+(antecedents in another order) and subsumed rules were added : the least model is the same,
+and createSet with normalise and pauseGC gives the same answers and enables the collector again
+'''
+def check_normalise(seeds) :
+    errors = 0
+    for seed in seeds :
+        generator = random.Random(seed)
+        element = random_base(seed)
+        variables = ['P%d' % i for i in range(12)]
+        for _ in range(generator.randint(0, 8)) :
+            antecedents = [name.strip() for name in generator.choice(element['rules'])[0].split(classes.et)]
+            consequent = generator.choice(element['rules'])[1]
+            change = generator.choice(('repeated', 'identical', 'subsumed'))
+            if change == 'repeated' :
+                antecedents.append(generator.choice(antecedents))
+            elif change == 'identical' :
+                generator.shuffle(antecedents)
+            else :
+                antecedents.append(generator.choice(variables))
+            element['rules'].insert(generator.randint(0, len(element['rules'])), [f" {classes.et} ".join(antecedents), consequent])
+        model = least_model(element)
+        rules, report = classes.normaliseRules(element['rules'])
+        if least_model(dict(element, rules=rules)) != model :
+            print(f"seed {seed} : normaliseRules changes the least model")
+            errors += 1
+        if report['kept'] != len(rules) :
+            print(f"seed {seed} : normaliseRules reports {report['kept']} rules kept instead of {len(rules)}")
+            errors += 1
+        data = classes.createSet(element, normalise=True, pauseGC=True)
+        kb, facts, _ = compiled.compile_set(data['rules'], data['facts base'], data['question'])
+        if not gc.isenabled() :
+            print(f"seed {seed} : createSet leaves the garbage collector disabled")
+            errors += 1
+        for name, v in kb.index.items() :
+            if forward_compiled.forward_algorithm(kb, facts, v) != (name in model) :
+                print(f"seed {seed} : the normalised set is wrong on {name}")
+                errors += 1
+    return errors
+
+
+'''
+Description : forward_rete on benchmark 6 bases (rules sharing their prefixes by groups), with
+a few facts removed at random, against least_model on every variable, and the number of joins
+of the network : the shared antecedents are joined once, each group then has its own joins
+'''
+def check_rete_groups(seeds) :
+    errors = 0
+    for seed in seeds :
+        generator = random.Random(seed)
+        k, n, groups = generator.randint(1, 12), generator.randint(0, 6), generator.randint(1, 4)
+        element = {'rules' : generateData.generateRulesBenchmark6(k, n, [], groups=groups)}
+        element['facts base'] = generateData.generateFBBenchmark(element['rules'], n, 6)
+        element['facts base'] = [f for f in element['facts base'] if generator.random() < 0.9]
+        element['question'] = 'Q.%d' % k
+        model = least_model(element)
+        kb, facts, _ = compile_base(element)
+        # one join per prefix of two antecedents or more : the shared prefixes, the prefixes
+        # of each group that has a rule, and the whole body of each rule
+        shared = n // 2
+        expected = max(0, shared - 1) + min(k, groups) * (n - max(shared, 1)) + k if n else 0
+        network = forward_rete.ReteNetwork(kb)
+        if network.n_joins != expected :
+            print(f"seed {seed} : {network.n_joins} joins instead of {expected}")
+            errors += 1
+        for name, v in kb.index.items() :
+            if forward_rete.forward_algorithm(kb, facts, v) != (name in model) :
+                print(f"seed {seed} : forward_rete is wrong on {name}")
+                errors += 1
+    return errors
+
+
+'''
+Description : Reasoner.ask with each strategy, and with the strategy it chooses, against
+least_model on every variable, and fit_log on times made from known coefficients, with
+features spread as in time_measuring (from one fact to thousands of antecedents) : the
+coefficients found are the known ones, and with 2 % of noise the estimates stay within 3 %
+'''
+def check_strategy(seeds) :
+    errors = 0
+    for seed in seeds :
+        generator = random.Random(seed)
+        element = random_base(seed)
+        model = least_model(element)
+        kb, facts, _ = compile_base(element)
+        reasoner = strategy.Reasoner(kb, facts)
+        for name, v in kb.index.items() :
+            for chosen in strategy.STRATEGIES + ('auto',) :
+                if reasoner.ask(v, chosen) != (name in model) :
+                    print(f"seed {seed} : Reasoner.ask is wrong on {name} with strategy {chosen}")
+                    errors += 1
+        if seed % 10 == 0 :
+            known = [math.exp(generator.uniform(math.log(1e-7), math.log(1e-4))) for _ in range(3)]
+            features = [(1, generator.randint(1, 100), 10 ** generator.uniform(0, 5)) for _ in range(40)]
+            times = [sum(c * f for c, f in zip(known, row)) for row in features]
+            found = strategy.fit_log(features, times)
+            if any(abs(f - c) > 0.01 * c for f, c in zip(found, known)) :
+                print(f"seed {seed} : fit_log finds {found} instead of {known}")
+                errors += 1
+            # with noise, a coefficient that weighs little on every row cannot be found again,
+            # the estimates must still be as close to the times as the noise
+            noisy = [t * generator.uniform(0.98, 1.02) for t in times]
+            found = strategy.fit_log(features, noisy)
+            if any(abs(sum(c * f for c, f in zip(found, row)) - t) > 0.03 * t for row, t in zip(features, times)) :
+                print(f"seed {seed} : fit_log does not fit noisy times")
+                errors += 1
+    return errors
+
+
+'''
+Description : horn_sat on random bases to which random goal clauses A ∧ B => ⊥ are added
+(none for one base in three, and ⊥ is a fact now and then) : the verdict, the minimal model
+of a satisfiable base and the goal clause of an unsatisfiable one against least_model
+'''
+def check_horn_sat(seeds) :
+    errors = 0
+    for seed in seeds :
+        generator = random.Random(seed)
+        element = random_base(seed)
+        model = least_model(element)
+        variables = ['P%d' % i for i in range(12)]
+        goals = []
+        for _ in range(generator.choice([0, 1, 3])) :
+            goals.append(generator.sample(variables, generator.randint(1, 3)))
+            element['rules'].insert(generator.randint(0, len(element['rules'])), [f" {classes.et} ".join(goals[-1]), classes.faux])
+        if generator.random() < 0.05 :
+            element['facts base'].append(classes.faux)
+        satisfiable = classes.faux not in element['facts base'] and not any(set(goal) <= model for goal in goals)
+        kb, facts, _ = compile_base(element)
+        verdict, result = horn_sat.solve(kb, facts)
+        if verdict != satisfiable :
+            print(f"seed {seed} : horn_sat finds the base {'satisfiable' if verdict else 'unsatisfiable'}")
+            errors += 1
+        elif verdict and (sorted(kb.names[v] for v in result) != sorted(model) or set(result[:len(facts)]) != set(facts)) :
+            print(f"seed {seed} : horn_sat gives a wrong minimal model")
+            errors += 1
+        elif not verdict and classes.faux in element['facts base'] :
+            if result is not None :
+                print(f"seed {seed} : horn_sat gives a goal clause while ⊥ is a fact")
+                errors += 1
+        elif not verdict and (kb.names[kb.heads[result]] != classes.faux or not {kb.names[v] for v in kb.antecedents(result)} <= model) :
+            print(f"seed {seed} : horn_sat gives a goal clause that is not violated")
+            errors += 1
+    return errors
+
+
+'''
+Description : a MaterializedModel whose facts and rules change at random (add_facts,
+retract_facts, add_rules, set_rules) : after each change, is_true on every variable
+(and on one that is in no rule) and true_set against least_model
+'''
+def check_materialized(seeds) :
+    errors = 0
+    for seed in seeds :
+        generator = random.Random(seed)
+        element = random_base(seed, n_facts=0)
+        listed = element['rules']
+        rules = classes.createSet(element)['rules']
+        names = ['P%d' % i for i in range(12)] + ['Unknown']
+        given = list(range(len(rules) // 2))
+        facts_base = set()
+        materialized = forward_materialized.MaterializedModel([rules[r] for r in given], facts_base)
+        for _ in range(15) :
+            action = generator.random()
+            if action < 0.35 :
+                new = generator.sample(names, generator.randint(1, 3))
+                materialized.add_facts(new)
+                facts_base |= set(new)
+            elif action < 0.55 and facts_base :
+                out = generator.sample(sorted(facts_base), generator.randint(1, min(3, len(facts_base))))
+                materialized.retract_facts(out)
+                facts_base -= set(out)
+            elif action < 0.85 :
+                new = [generator.randrange(len(rules)) for _ in range(generator.randint(1, 3))]
+                materialized.add_rules([rules[r] for r in new])
+                given += new
+            else :
+                given = generator.sample(range(len(rules)), generator.randint(0, len(rules)))
+                materialized.set_rules([rules[r] for r in given])
+            model = least_model({'rules' : [listed[r] for r in given], 'facts base' : list(facts_base)})
+            if set(materialized.true_set()) != model :
+                print(f"seed {seed} : MaterializedModel.true_set is wrong")
+                errors += 1
+            for name in names :
+                if materialized.is_true(name) != (name in model) :
+                    print(f"seed {seed} : MaterializedModel.is_true is wrong on {name}")
+                    errors += 1
+    return errors
+
+
+'''
+Description : the anytime queries, forward and backward (on a new session, and on a session
+shared by the queries of a base), run with a budget of one step or of one firing and resumed
+until they are decided, against least_model on every variable
+'''
+def check_anytime(seeds) :
+    errors = 0
+    budgets = {'steps' : anytime.Budget(steps=1), 'firings' : anytime.Budget(firings=1)}
+    for seed in seeds :
+        element = random_base(seed)
+        model = least_model(element)
+        kb, facts, _ = compile_base(element)
+        for budget_name, budget in budgets.items() :
+            session = backward_compiled.BackwardSession(kb, facts)
+            queries = {
+                'forward' : lambda v : anytime.forward(kb, facts, v, budget),
+                'backward' : lambda v : anytime.backward(kb, facts, v, budget),
+                'backward on a shared session' : lambda v : anytime.backward(kb, facts, v, budget, session),
+            }
+            for name, v in kb.index.items() :
+                expected = compiled.TRUE if name in model else compiled.FALSE
+                for query_name, start in queries.items() :
+                    value, query = start(v)
+                    runs = 1
+                    # every run does some work : a query is decided after a bounded number of them
+                    while value == compiled.UNKNOWN and runs <= 10 * (kb.n_vars + len(kb.body_vars) + kb.n_rules) :
+                        value = query.run(budget)
+                        runs += 1
+                    if value != expected :
+                        print(f"seed {seed} : the {query_name} query with one {budget_name[:-1]} is wrong on {name}")
+                        errors += 1
+    return errors
+
+
+'''
+Description : the derivations of forward_stream : each variable of the least model that is
+not a fact is given once, with a rule of which it is the consequent and whose antecedents
+were all given before (or are facts)
+'''
+def check_forward_stream(seeds) :
+    errors = 0
+    for seed in seeds :
+        element = random_base(seed)
+        model = least_model(element)
+        kb, facts, _ = compile_base(element)
+        known = set(facts)
+        derived = []
+        for variable, rule in forward_stream.derivations(kb, facts, with_rules=True) :
+            if kb.heads[rule] != variable or not set(kb.antecedents(rule)) <= known :
+                print(f"seed {seed} : forward_stream gives {kb.names[variable]} with a rule that does not derive it")
+                errors += 1
+            known.add(variable)
+            derived.append(kb.names[variable])
+        if len(derived) != len(set(derived)) or set(derived) != model - set(element['facts base']) :
+            print(f"seed {seed} : forward_stream does not give the least model")
+            errors += 1
+    return errors
+
+
+'''
+Description : forwardV3 and backwardV5 (main, and main_steps with its printing silenced) on
+a set loaded with each layout, 'objects', 'slots' and 'columns' : the answers and the values
+backwardV5 leaves are the same for the three layouts. They are not compared with least_model :
+forwardV3 answers False on a question that is a fact, and backwardV5 True on a question left ON
+'''
+def check_layouts(seeds) :
+    def run(element, layout, name) :
+        data = classes.createSet(dict(element, question=name), layout)
+        rules, question = data['rules'], data['question']
+        answers = [forward.forward_algorithm(forward.pre_processing(data['facts base'], rules), question)]
+        values = []
+        for main in (backward.main, backward.main_steps) :
+            data = classes.createSet(dict(element, question=name), layout)
+            rules, question = data['rules'], data['question']
+            backward.counter = 0
+            backward.root = math.inf
+            backward.on_list = []
+            backward.pre_processing(rules, data['facts base'])
+            with redirect_stdout(StringIO()) :
+                answers.append(main(question))
+            values.append(sorted((v.name, str(v.value)) for rule in rules for v in list(rule.antecedents) + [rule.consequent]))
+        return answers, values
+
+    errors = 0
+    for seed in seeds :
+        element = random_base(seed)
+        for name in sorted({rule[1] for rule in element['rules']}) :
+            results = {layout : run(element, layout, name) for layout in ('objects', 'slots', 'columns')}
+            if results['slots'] != results['objects'] or results['columns'] != results['objects'] :
+                print(f"seed {seed} : the layouts give different results on {name}")
+                errors += 1
+    return errors
+
+
+def check_all(n_seeds=500) :
+    seeds = range(n_seeds)
+    checks = (
+        check_compiled_engines,
+        check_forward_batch,
+        check_bitparallel,
+        check_backward_iterative,
+        check_backward_session,
+        check_backward_memo,
+        check_forward_session,
+        check_forward_retraction,
+        check_reachability,
+        check_contraction,
+        check_normalise,
+        check_rete_groups,
+        check_strategy,
+        check_horn_sat,
+        check_materialized,
+        check_anytime,
+        check_forward_stream,
+        check_layouts,
+    )
+    errors = 0
+    for check in checks :
+        found = check(seeds)
+        print(f"{check.__name__} : {found} errors on {n_seeds} bases")
+        errors += found
+    return errors
+
+
 def main():
     if len(sys.argv) != 7:
         print("Usage: python test.py <alg> <benchmark> <k> <max> <step> <rep>")
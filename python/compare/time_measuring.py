@@ -7,7 +7,6 @@ algorithms on different benchmarks
 '''
 import time
 import numpy as np
-import copy
 
 import resource
 resource.setrlimit(resource.RLIMIT_STACK, (2**29,-1))
@@ -15,13 +14,17 @@ resource.setrlimit(resource.RLIMIT_STACK, (2**29,-1))
 import pandas as pd
 
 from algorithms import backwardV5 as backward
+from algorithms import backwardV7 as backward_iterative
 from algorithms import forwardV3 as forward
+from algorithms import backward_compiled
+from algorithms import forward_compiled
+from algorithms import forward_rete
+from algorithms import bidirectional
+
+import compiled
+import generateData
 
 from benchmarks import benchmark1 
-from benchmarks import benchmark2 
-from benchmarks import benchmark3 
-from benchmarks import benchmark4 
-from benchmarks import benchmark5 
 
 import timeit as timeit
 
@@ -46,6 +49,8 @@ data_path = os.path.join(os.getcwd(), relative_path)
 
 
 def reset_state(rules, facts_base, question):
+    # a sweep of the objects, for forward, backward and backward_iterative : the engines
+    # of a CompiledKB start a query with QueryState.reset instead (measure_compiled_query)
     for rule in rules:
         rule.reset()
         for antecedent in rule.antecedents:
@@ -60,17 +65,28 @@ def reset_state(rules, facts_base, question):
         question.reset()
 
 
-def measure_execution_time(benchmark, alg, k, sizes, repeat):
+def measure_execution_time(benchmark, alg, k, sizes, repeat, generated=False):
+    """
+    With generated=False the data is benchmark1 whatever the benchmark given, as the
+    CSV files measured so far. With generated=True it is the given benchmark, made by
+    generateData.generateBenchmark (the data of strategy.calibrate).
+    """
     execution_times = []
 
     for n in sizes:
         print(f"Processing size: {n}\n")
         
         # Generate benchmark data
-        data = benchmark1.create_benchmark2(k=k, n=n, show=False)
+        if generated:
+            data = generateData.generateBenchmark(k, n, benchmark=int(load_data.get_module_number(benchmark)), variableBase=[], questionBenchmark3=True)
+        else:
+            data = benchmark1.create_benchmark2(k=k, n=n, show=False)
         rules, facts_base, question = load_data.load_benchmark2(data)
 
-        
+        if alg in ("forward_compiled", "forward_sliced", "forward_rete", "backward_compiled", "bidirectional"):
+            execution_times.append((n, measure_compiled_query(alg, rules, facts_base, question, repeat)))
+            continue
+
         times = []
 
         for _ in range(repeat):
@@ -96,8 +112,15 @@ def measure_execution_time(benchmark, alg, k, sizes, repeat):
                 backward.main(question)
                 end_time = time.time()
 
+            elif alg == "backward_iterative":
+                backward_iterative.pre_processing(rules, facts_base)
+
+                start_time = time.time()
+                backward_iterative.main(question)
+                end_time = time.time()
+
             else:
-                raise ValueError("Algorithm can be either 'forward' or 'backward'")
+                raise ValueError("Algorithm can be either 'forward', 'backward', 'backward_iterative', 'forward_compiled', 'forward_sliced', 'forward_rete', 'backward_compiled' or 'bidirectional'")
 
             duration = end_time - start_time
             times.append(duration)
@@ -109,6 +132,42 @@ def measure_execution_time(benchmark, alg, k, sizes, repeat):
 
 
 
+def measure_compiled_query(alg, rules, facts_base, question, repeat):
+    """
+    Average time of one query on a compiled knowledge base.
+    The kb is compiled and the query state allocated once : each repetition only
+    starts a new epoch of the state (O(facts)), there is no reset_state sweep
+    and no pre_processing of the rules.
+    """
+    kb, facts, q = compiled.compile_set(rules, facts_base, question)
+    engine = {"backward_compiled": backward_compiled, "bidirectional": bidirectional}.get(alg, forward_compiled)
+    # the slice of the question is built once, as a SliceCache would
+    relevant = forward_compiled.relevance_slice(kb, q) if alg == "forward_sliced" else None
+    # the network is built once per kb, as the kb itself
+    network = forward_rete.ReteNetwork(kb) if alg == "forward_rete" else None
+    if network is not None:
+        engine = forward_rete
+        state = forward_rete.pre_processing(kb, facts, network)
+    else:
+        state = engine.pre_processing(kb, facts)
+
+    times = []
+    for _ in range(repeat):
+        start_time = time.time()
+        state.reset(facts)
+        if relevant is not None:
+            forward_compiled.run_sliced(kb, state, q, relevant)
+        elif network is not None:
+            forward_rete.run(kb, state, q, network)
+        else:
+            engine.run(kb, state, q)
+        end_time = time.time()
+        times.append(end_time - start_time)
+
+    return np.mean(times)
+
+
+
 def time_pre_processing(algorithm,rules,facts_base,repeat) :
     timer = timeit.timeit(lambda:algorithm.pre_processing(facts_base=facts_base,rules=rules) , number=repeat)
     return timer
@@ -128,8 +187,8 @@ def save_execution_times_to_csv(execution_times, filename):
     print(f"Execution times saved to {filename}")
 
 def main():
-    if len(sys.argv) != 8:
-        print("Usage: python drawGraph.py <alg> <benchmark> <k> <max> <step> <rep> <both>")
+    if len(sys.argv) not in (8, 9):
+        print("Usage: python drawGraph.py <alg> <benchmark> <k> <max> <step> <rep> <both> [generated]")
         sys.exit(1)
 
     alg_name = sys.argv[1]
@@ -139,6 +198,7 @@ def main():
     step = int(sys.argv[5])
     repetitions = int(sys.argv[6])
     both = sys.argv[7].lower() == "true"
+    generated = len(sys.argv) == 9 and sys.argv[8].lower() == "true"
    
     sizes = np.arange(1, size_max + 1, step)
     
@@ -147,8 +207,8 @@ def main():
     benchmark_module = load_data.get_module(benchmark_name)
 
     if both:
-        exec_timef = measure_execution_time(alg="forward", benchmark=benchmark_module, sizes=sizes, k=k, repeat=repetitions)
-        exec_timeb = measure_execution_time(alg="backward", benchmark=benchmark_module, sizes=sizes, k=k, repeat=repetitions)
+        exec_timef = measure_execution_time(alg="forward", benchmark=benchmark_module, sizes=sizes, k=k, repeat=repetitions, generated=generated)
+        exec_timeb = measure_execution_time(alg="backward", benchmark=benchmark_module, sizes=sizes, k=k, repeat=repetitions, generated=generated)
 
         # Generate filenames for both forward and backward execution times
         f_filename = f"forwardb{benchmark_name}k{k}n{size_max}p{step}r{repetitions}.csv"
@@ -160,7 +220,7 @@ def main():
 
     else:
         # Execute the algorithm and measure the execution time
-        exec_time = measure_execution_time(alg=alg_name, benchmark=benchmark_module, sizes=sizes, k=k, repeat=repetitions)
+        exec_time = measure_execution_time(alg=alg_name, benchmark=benchmark_module, sizes=sizes, k=k, repeat=repetitions, generated=generated)
         
         # Generate filename based on the algorithm name
         filename = f"{alg_name}b{benchmark_name}k{k}n{size_max}p{step}r{repetitions}.csv"
@@ -24,7 +24,7 @@ def generationToPrint(set,vb=False, benchmark=False, k=False, n=False, orientati
     if vb :
         print("Variables Base : " + printDB(vb))
     length = len(set)
-    if not benchmark or benchmark == 4 :
+    if not benchmark or benchmark == 4 or benchmark == 6 :
         for i in range (length) :
             printElement(set[i])
             print("")
@@ -0,0 +1,35 @@
+'''
+Description : NumPy helpers shared by the vectorized engines (forward_bitparallel,
+forward_sparse) on the arrays of a CompiledKB.
+'''
+
+import numpy as np
+
+
+'''
+Description : numpy view of an array of a CompiledKB, without a copy.
+
+Input : "view", one of the read-only int32 arrays of a CompiledKB (kb.heads, kb.ant_offsets, ...)
+Output : a read-only numpy array of int32 sharing its memory
+
+Example : as_numpy(kb.heads)[rules] are the consequents of the rules of the array rules
+'''
+def as_numpy(view) :
+    return np.frombuffer(view, dtype=np.int32)
+
+
+'''
+Description : concatenation of many ranges, without a Python loop.
+
+Input : "starts", "ends", two numpy arrays of the same size
+Output : the concatenation of range(starts[i], ends[i]) for every i, as a numpy array
+
+Example : concatenated_ranges(np.array([0, 5]), np.array([2, 7])) returns [0, 1, 5, 6]
+'''
+def concatenated_ranges(starts, ends) :
+    lengths = ends - starts
+    total = lengths.sum()
+    if total == 0 :
+        return np.zeros(0, dtype=np.int64)
+    shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return shifts + np.arange(total)